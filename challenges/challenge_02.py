@@ -8,6 +8,8 @@
 
 import os
 
+from challenges.core.xor import bytes_xor
+
 
 def run_challenge(input_data: str):
     """Challenge 2: Fixed XOR."""
@@ -36,7 +38,6 @@ def run_challenge(input_data: str):
                     "Input data must be of equal length to the fixed XOR bytes."
                 )
 
-            # Zip function pairs bytes from both inputs into a list of tuples
             xor_result = bytes_xor(input_bytes, fixed_xor_compare_bytes)
 
             print(f"Result (XOR): {xor_result.hex()}")
@@ -50,11 +51,3 @@ def run_challenge(input_data: str):
             print(f"❌ Error processing input: {e}")
     else:
         print("❌ No input data provided.")
-
-
-def bytes_xor(a: bytes, b: bytes) -> bytes:
-    """Perform XOR operation on two byte sequences."""
-    if len(a) != len(b):
-        raise ValueError("Byte sequences must be of equal length.")
-
-    return bytes(x ^ y for x, y in zip(a, b))
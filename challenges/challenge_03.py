@@ -7,13 +7,17 @@
 # We used Frankenstein.txt as the text to analyze the frequency of letters.
 # """
 
+import hashlib
+import json
 import os
+import numpy as np
 import plotext as plt
 
 from collections import Counter
+from functools import lru_cache
 from string import ascii_lowercase
-from typing import Optional
-from challenges.challenge_02 import bytes_xor
+from challenges.core.xor import ENGLISH_FREQUENCIES, ScoredGuess
+from challenges.core.xor import crack_single_byte_xor as core_crack_single_byte_xor
 from dataclasses import dataclass, astuple
 
 
@@ -28,29 +32,147 @@ def get_freqs(text, letters) -> dict[str, float]:
     return {letter: counts[letter] / total for letter in letters}
 
 
-with open(f"{os.getcwd()}/challenges/assets/frankenstein.txt", "r") as f:
-    book = f.read()
-    english_frequencies = get_freqs(text=book, letters=ascii_lowercase)
+MODEL_VERSION = 1  # Bump when the artifact layout or scoring changes
+CHUNK_SIZE = 1 << 20  # Corpus bytes read per pass while compiling the model
+CORE_TABLE_TOLERANCE = 5e-6  # The core's table is rounded to five decimals
 
 
-@dataclass(order=True)
-class ScoredGuess:
-    """Data class to hold a scored guess for the single-byte XOR cipher."""
+@dataclass
+class FrequencyModel:
+    """Expected byte frequencies compiled from an English corpus."""
 
-    score: float = float("inf")  # Initialize with a high score
-    key: Optional[bytes] = None  # The cipher key used for XOR
-    ciphertext: Optional[bytes] = None  # The ciphertext being decoded
-    plaintext: Optional[bytes] = None  # The resulting plaintext after decoding
+    frequencies: np.ndarray  # 256 floats, zero for bytes that are not scored
+    letters: str  # The letters that take part in scoring
+    source_hash: str  # SHA-256 of the corpus the model was compiled from
 
-    @classmethod
-    def from_key(cls, ciphertext: bytes, key: bytes) -> "ScoredGuess":
-        """Create a ScoredGuess from ciphertext and key."""
-        full_key = bytes([key]) * len(
-            ciphertext
-        )  # Repeat key to match ciphertext length
-        plaintext = bytes_xor(ciphertext, full_key)
-        score = fitting_quotient(plaintext)
-        return cls(score=score, key=key, ciphertext=ciphertext, plaintext=plaintext)
+    @property
+    def scored_bytes(self) -> np.ndarray:
+        """Byte values that take part in scoring."""
+        return np.array([ord(letter) for letter in self.letters])
+
+    @property
+    def expected_frequencies(self) -> np.ndarray:
+        """Expected frequency of each scored byte, in scored_bytes order."""
+        return self.frequencies[self.scored_bytes]
+
+    def as_dict(self) -> dict[str, float]:
+        """Return the letter frequencies in the shape get_freqs() produces."""
+        return {letter: float(self.frequencies[ord(letter)]) for letter in self.letters}
+
+
+def get_corpus_path() -> str:
+    """Path of the corpus the English model is compiled from."""
+    return f"{os.getcwd()}/challenges/assets/frankenstein.txt"
+
+
+def get_model_path() -> str:
+    """Path of the compiled English model artifact."""
+    return f"{os.getcwd()}/challenges/assets/frankenstein.model.json"
+
+
+def hash_corpus(corpus_path: str) -> str:
+    """Stream the corpus through SHA-256 without holding it in memory."""
+    digest = hashlib.sha256()
+    with open(corpus_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_frequency_model(
+    corpus_path: str, letters: str = ascii_lowercase
+) -> FrequencyModel:
+    """Compile a FrequencyModel by streaming the corpus in fixed-size chunks."""
+    digest = hashlib.sha256()
+    counts = np.zeros(256, dtype=np.int64)
+
+    with open(corpus_path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+            counts += np.bincount(np.frombuffer(chunk, np.uint8), minlength=256)
+
+    scored_bytes = [ord(letter) for letter in letters]
+    frequencies = np.zeros(256)
+    frequencies[scored_bytes] = counts[scored_bytes] / counts[scored_bytes].sum()
+    return FrequencyModel(frequencies, letters, digest.hexdigest())
+
+
+def save_frequency_model(model: FrequencyModel, model_path: str, corpus_path: str):
+    """Persist the model along with what is needed to detect a stale corpus."""
+    corpus_stat = os.stat(corpus_path)
+    artifact = {
+        "version": MODEL_VERSION,
+        "letters": model.letters,
+        "source_hash": model.source_hash,
+        "source_size": corpus_stat.st_size,
+        "source_mtime_ns": corpus_stat.st_mtime_ns,
+        "frequencies": model.frequencies.tolist(),
+    }
+
+    # Write to a temporary file first so readers never see a partial artifact
+    temp_path = f"{model_path}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(artifact, f)
+    os.replace(temp_path, model_path)
+
+
+def refresh_model_artifact(model: FrequencyModel, model_path: str, corpus_path: str):
+    """Best-effort save; a read-only checkout still works from memory."""
+    try:
+        save_frequency_model(model, model_path, corpus_path)
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_english_model() -> FrequencyModel:
+    """Load the English model, compiling it only when the corpus has changed.
+
+    The artifact is trusted while the corpus size and mtime match what was
+    recorded. Otherwise the corpus is re-hashed and the model is rebuilt only
+    if the hash differs as well.
+    """
+    corpus_path, model_path = get_corpus_path(), get_model_path()
+
+    try:
+        with open(model_path, "r") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        artifact = None
+
+    if artifact and artifact.get("version") == MODEL_VERSION:
+        model = FrequencyModel(
+            np.array(artifact["frequencies"]),
+            artifact["letters"],
+            artifact["source_hash"],
+        )
+        corpus_stat = os.stat(corpus_path)
+        if (
+            artifact["source_size"] == corpus_stat.st_size
+            and artifact["source_mtime_ns"] == corpus_stat.st_mtime_ns
+        ):
+            return model
+        if artifact["source_hash"] == hash_corpus(corpus_path):
+            # Only the file metadata changed (e.g. a fresh checkout)
+            refresh_model_artifact(model, model_path, corpus_path)
+            return model
+
+    model = compile_frequency_model(corpus_path)
+    refresh_model_artifact(model, model_path, corpus_path)
+    return model
+
+
+def matches_core_frequencies(model: FrequencyModel) -> bool:
+    """Check a compiled model against the core's ENGLISH_FREQUENCIES table.
+
+    The core scores without a corpus from that table, so it has to be
+    updated whenever the corpus or the way the model is compiled changes.
+    """
+    frequencies = model.as_dict()
+    return frequencies.keys() == ENGLISH_FREQUENCIES.keys() and all(
+        abs(frequencies[letter] - expected) <= CORE_TABLE_TOLERANCE
+        for letter, expected in ENGLISH_FREQUENCIES.items()
+    )
 
 
 def run_challenge(input_data: str):
@@ -70,8 +192,14 @@ def run_challenge(input_data: str):
 
     print(f"📊 Letter Frequencies in Frankenstein.txt:")
 
+    english_frequencies = get_english_model().as_dict()
     plot_letter_frequencies(english_frequencies)
 
+    if matches_core_frequencies(get_english_model()):
+        print("✅ The compiled model matches challenges.core.ENGLISH_FREQUENCIES")
+    else:
+        print("⚠️ The compiled model differs from challenges.core.ENGLISH_FREQUENCIES")
+
     if input_data:
         try:
             input_bytes = bytes.fromhex(input_data)
@@ -108,31 +236,9 @@ def run_challenge(input_data: str):
         print("❌ No input data provided.")
 
 
-def fitting_quotient(text: bytes) -> float:
-    """Score the text based on letter frequency."""
-    score = 0.0
-    l = len(text)
-
-    for letter, frequency_expected in english_frequencies.items():
-        frequency_actual = text.count(ord(letter)) / l
-        score += abs(frequency_expected - frequency_actual)
-
-    return score
-
-
 def crack_single_byte_xor(ciphertext: bytes) -> ScoredGuess:
-    """Crack a single-byte XOR cipher."""
-
-    best_guess = ScoredGuess()
-
-    for candidate_key in range(256):
-        guess = ScoredGuess.from_key(ciphertext, candidate_key)
-        best_guess = min(best_guess, guess, key=lambda g: g.score)
-
-    if best_guess.key is None or best_guess.plaintext is None:
-        exit("❌ No valid key found for the single-byte XOR cipher.")
-
-    return best_guess
+    """Crack a single-byte XOR cipher with the core scorer and the corpus model."""
+    return core_crack_single_byte_xor(ciphertext, get_english_model().as_dict())
 
 
 def plot_letter_frequencies(
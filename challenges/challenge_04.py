@@ -6,26 +6,34 @@
 # string with the highest score based on letter frequency analysis.
 # """
 
+import heapq
 import os
 
-from challenges.challenge_03 import ScoredGuess, crack_single_byte_xor, get_freqs
+from challenges.core import ScoredGuess, crack_single_byte_xor_many
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from dataclasses import astuple
-from string import ascii_lowercase
+from typing import Iterator, Optional
+
+BATCH_SIZE = 4096  # Most lines handed to a worker per task
+BATCH_MEMORY_BUDGET = 1 << 26  # Scoring memory a worker may use per batch, in bytes
+# Scoring memory per line: four (256,) float/int64 rows (histogram, scores and
+# temporaries) plus about 10 bytes per ciphertext byte for the packed rows
+SCORING_BYTES_PER_LINE = 4 * 256 * 8
+PACKED_BYTES_PER_BYTE = 10
+MAX_PENDING_PER_WORKER = 2  # Batches in flight per worker, bounds memory use
 
 
 def run_challenge(input_data: str):
-    """Challenge 4: Detect single-character XOR."""
+    """Challenge 4: Detect single-character XOR.
 
-    print("🔍 Attempting to find a single-byte XOR cipher...")
+    `input_data` may name a file of hex lines to scan instead of the default.
+    """
 
-    if not input_data:
-        # Load input data from file if not provided
-        with open(f"{os.getcwd()}/challenges/inputs/challenge_04.txt", "r") as f:
-            input_data = [line.strip() for line in f if line.strip()]
+    print("🔍 Attempting to find a single-byte XOR cipher...")
 
-    print("📥 Input (hexs):", input_data)
+    input_path = input_data or f"{os.getcwd()}/challenges/inputs/challenge_04.txt"
 
-    lines = [bytes.fromhex(line) for line in input_data]
+    print("📥 Input (file):", input_path)
 
     with open(f"{os.getcwd()}/challenges/results/challenge_04.txt", "r") as f:
         result_text = f.read().strip()
@@ -34,14 +42,13 @@ def run_challenge(input_data: str):
 
     print("🔍 Analyzing hexadecimal strings")
 
-    overall_best = ScoredGuess()
-    for line in lines:
-        print(end=".", flush=True)
-        candidate = crack_single_byte_xor(line)
-        overall_best = min(overall_best, candidate)
+    try:
+        overall_best = detect_single_byte_xor(input_path, quiet_mode=False)[0]
+    except (OSError, ValueError, IndexError) as e:
+        print(f"❌ Error processing input: {e}")
+        return
 
     score, key, _, plaintext = astuple(overall_best)
-    print()
     print(
         f"Key: {chr(key)}, Score: {score:.4f}, Decoded Text: {plaintext.decode('utf-8', errors='ignore')}"
     )
@@ -50,3 +57,98 @@ def run_challenge(input_data: str):
         print("✅ Decoding successful!")
     else:
         print("❌ Decoding did not match expected result.")
+
+
+def read_hex_batches(
+    path: str, batch_size: int = BATCH_SIZE
+) -> Iterator[tuple[list[bytes], int]]:
+    """Stream a file of hex lines as batches of decoded ciphertexts.
+
+    Each batch is yielded with the number of file bytes it was read from, so
+    only one batch is ever held in memory. A batch ends after `batch_size`
+    lines, or earlier once scoring it would take BATCH_MEMORY_BUDGET bytes,
+    which happens with long lines. Blank lines are skipped.
+    """
+    batch, consumed, longest = [], 0, 0
+    with open(path, "rb") as f:
+        for line in f:
+            consumed += len(line)
+            line = line.strip()
+            if line:
+                batch.append(bytes.fromhex(line.decode("ascii")))
+                longest = max(longest, len(batch[-1]))
+            if len(batch) == batch_size or (
+                batch_memory(len(batch), longest) >= BATCH_MEMORY_BUDGET
+            ):
+                yield batch, consumed
+                batch, consumed, longest = [], 0, 0
+
+    if batch or consumed:
+        yield batch, consumed
+
+
+def batch_memory(num_lines: int, longest: int) -> int:
+    """Estimate the bytes needed to score a batch of lines in one worker."""
+    return num_lines * (SCORING_BYTES_PER_LINE + PACKED_BYTES_PER_BYTE * longest)
+
+
+def crack_batch(lines: list[bytes], top_k: int) -> list[ScoredGuess]:
+    """Worker task: the best `top_k` guesses within one batch of lines."""
+    return crack_single_byte_xor_many(lines, top_k=top_k)
+
+
+def detect_single_byte_xor(
+    path: str,
+    top_k: int = 1,
+    batch_size: int = BATCH_SIZE,
+    workers: Optional[int] = None,
+    quiet_mode: bool = True,
+) -> list[ScoredGuess]:
+    """Find the lines of a hex file most likely to be single-byte XORed English.
+
+    The file is streamed in batches which are cracked across a process pool.
+    At most MAX_PENDING_PER_WORKER batches per worker are in flight, and the
+    per-batch results are merged into a global top-k, best first.
+    """
+    workers = workers or os.cpu_count() or 1
+    total_size = os.path.getsize(path)
+    best: list[ScoredGuess] = []
+    done_size = 0
+
+    def merge(results: list[ScoredGuess], size: int):
+        nonlocal best, done_size
+        best = heapq.nsmallest(top_k, best + results)
+        done_size += size
+        if not quiet_mode and total_size:
+            print(
+                f"\r⏳ Scanned {done_size / total_size:6.1%} of {total_size} bytes",
+                end="",
+                flush=True,
+            )
+
+    batches = read_hex_batches(path, batch_size)
+
+    if workers == 1:
+        for lines, size in batches:
+            merge(crack_batch(lines, top_k) if lines else [], size)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = {}
+            for lines, size in batches:
+                if lines:
+                    pending[executor.submit(crack_batch, lines, top_k)] = size
+                else:
+                    merge([], size)
+
+                if len(pending) >= workers * MAX_PENDING_PER_WORKER:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        merge(future.result(), pending.pop(future))
+
+            for future in wait(pending).done:
+                merge(future.result(), pending.pop(future))
+
+    if not quiet_mode:
+        print()
+
+    return best
@@ -10,9 +10,7 @@
 
 import os
 
-from itertools import cycle, islice
-
-from challenges.challenge_02 import bytes_xor
+from challenges.core.xor import repeating_key_xor
 
 
 def run_challenge(input_data: str):
@@ -44,10 +42,3 @@ def run_challenge(input_data: str):
         print("✅ Encoding successful!")
     else:
         print("❌ Encoding did not match expected result.")
-
-
-def repeating_key_xor(key: bytes, plaintext: bytes) -> bytes:
-    """Encrypt plaintext using repeating-key XOR with the given key."""
-    # Repeat the key to match the length of the plaintext
-    repeated_key = bytes(islice(cycle(key), len(plaintext)))
-    return bytes_xor(plaintext, repeated_key)
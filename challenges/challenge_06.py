@@ -8,15 +8,22 @@
 # """
 
 import os
+import numpy as np
 
-from challenges.challenge_02 import bytes_xor
-from challenges.challenge_03 import crack_single_byte_xor
+from challenges.core import as_byte_array, score_histograms
 from challenges.challenge_05 import repeating_key_xor
-from itertools import combinations
+from challenges.core.xor import hamming_distance
 from base64 import b64decode
+from dataclasses import dataclass
+from enum import Enum
 from pprint import pprint
+from typing import Optional
 
-MAX_KEY_SIZE = 40  # Maximum key size to consider for the repeating-key XOR cipher
+MAX_KEY_SIZE = 4096  # Maximum key size to consider for the repeating-key XOR cipher
+MAX_COINCIDENCE_KEY_SIZE = 1 << 17  # Maximum key size for the coincidence method
+MIN_BLOCK_PAIRS = 64  # Key sizes must fit this many block pairs into the ciphertext
+MIN_COINCIDENCE_BLOCK_PAIRS = 2  # The same for the coincidence method
+FOLD_STANDARD_ERRORS = 3.0  # Chance score noise a divisor may trail a multiple by
 
 
 def run_challenge(input_data: str):
@@ -53,16 +60,24 @@ def run_challenge(input_data: str):
     key_sizes = guess_key_size(ciphertext, num_guesses=5)
 
     print()
-    print("🔑 Guessed Key Sizes (confidence, size):")
+    print("🔑 Guessed Key Sizes (score, size, margin):")
     pprint(key_sizes)
     print()
 
-    candidates = [crack_repeating_key_xor(ciphertext, size) for _, size in key_sizes]
+    # Largest sizes first, so smaller divisors reuse their column histograms
+    transposition = Transposition(ciphertext)
+    candidates = [
+        crack_repeating_key_xor(ciphertext, size, transposition)
+        for size in sorted((guess.size for guess in key_sizes), reverse=True)
+    ]
     candidates.sort()
     best_candidate = candidates[0]
     best_key = best_candidate[1]
 
-    print(f"🏆 Best Key: {best_key}, Score: {best_candidate[0]:.4f}")
+    print(
+        f"🏆 Best Key: {best_key}, Size: {len(best_key)}, "
+        f"Score: {best_candidate[0]:.4f}"
+    )
     print("🔓 Attempting to decrypt with the best key...")
 
     plaintext = (
@@ -79,57 +94,234 @@ def run_challenge(input_data: str):
         print("❌ Decoding did not match expected result.")
 
 
-def crack_repeating_key_xor(ciphertext: bytes, key_size: int) -> tuple[float, bytes]:
-    """Crack a repeating-key XOR cipher given the ciphertext and key size."""
-    # Split the ciphertext into chunks of each byte with a gap of the given key size.
-    chunks = [ciphertext[i::key_size] for i in range(key_size)]
-    cracks = [crack_single_byte_xor(chunk) for chunk in chunks]
+class Transposition:
+    """Column view of a ciphertext for every candidate key size.
+
+    Column i of key size k holds bytes i, i + k, i + 2k, ... and is exposed as
+    a strided view of the ciphertext rather than a copy. Column histograms are
+    cached per key size, and the histograms of k are derived from those of
+    any cached multiple of k instead of rescanning the data.
+    """
+
+    def __init__(self, ciphertext: bytes):
+        self.data = as_byte_array(ciphertext)
+        self._histograms: dict[int, np.ndarray] = {}
+
+    def column(self, index: int, key_size: int) -> np.ndarray:
+        """Zero-copy view of one column for the given key size."""
+        return self.data[index::key_size]
 
-    combined_score = sum(guess.score for guess in cracks) / key_size
-    key = bytes(guess.key for guess in cracks)
+    def histograms(self, key_size: int) -> np.ndarray:
+        """Byte histogram of every column, with shape (key_size, 256)."""
+        if key_size in self._histograms:
+            return self._histograms[key_size]
+
+        multiple = next(
+            (size for size in self._histograms if size % key_size == 0), None
+        )
+        if multiple is not None:
+            # Column i of key_size is the union of columns i, i + key_size, ...
+            # of the multiple
+            histograms = (
+                self._histograms[multiple]
+                .reshape(multiple // key_size, key_size, 256)
+                .sum(axis=0)
+            )
+        else:
+            # Offset each column into its own 256-bin range for one bincount
+            columns = np.arange(self.data.size) % key_size
+            histograms = np.bincount(
+                columns * 256 + self.data, minlength=key_size * 256
+            ).reshape(key_size, 256)
+
+        self._histograms[key_size] = histograms
+        return histograms
+
+
+def crack_repeating_key_xor(
+    ciphertext: bytes, key_size: int, transposition: Optional[Transposition] = None
+) -> tuple[float, bytes]:
+    """Crack a repeating-key XOR cipher given the ciphertext and key size.
+
+    Pass the same Transposition when cracking several key sizes of one
+    ciphertext so that their column histograms are shared. A multiple of
+    the real key size cracks to the real key repeated, so such a key is
+    cracked again at its period and the shorter key is returned.
+    """
+    transposition = transposition or Transposition(ciphertext)
+    histograms = transposition.histograms(key_size)
+
+    # Every column is scored against every key byte in one pass
+    scores = score_histograms(histograms, histograms.sum(axis=1))
+    key = scores.argmin(axis=1)
+
+    combined_score = float(scores[np.arange(key_size), key].mean())
+    key = bytes(key.tolist())
+
+    period = key_period(key)
+    if period < key_size:
+        return crack_repeating_key_xor(ciphertext, period, transposition)
     return combined_score, key
 
 
-def guess_key_size(ciphertext: bytes, num_guesses: int = 1) -> list[tuple[float, int]]:
-    """Guess the key size for a repeating-key XOR cipher based on Hamming distance."""
+def key_period(key: bytes) -> int:
+    """Length of the shortest prefix that repeats to make up the whole key."""
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key == key[:period] * (len(key) // period):
+            return period
+    return len(key)
+
+
+@dataclass(order=True)
+class KeySizeGuess:
+    """Data class to hold a scored key size for the repeating-key XOR cipher."""
+
+    score: float  # Normalised edit distance, lower is better
+    size: int  # The candidate key size
+    margin: float = 0.0  # Standard deviations below the mean score of all sizes
+
+
+class KeySizeMethod(Enum):
+    HAMMING = "hamming"  # Edit distance between consecutive blocks
+    COINCIDENCE = "coincidence"  # FFT autocorrelation of byte equality
+
+
+# Upper bound on the variance of one compared pair's contribution to a score:
+# eight bits that each differ or not, or one byte that matches or not
+SCORE_VARIANCE_BOUNDS = {KeySizeMethod.HAMMING: 2.0, KeySizeMethod.COINCIDENCE: 0.25}
 
-    def get_score(size: int) -> float:
-        # This is 4 KEYSIZE chunks of the ciphertext.
-        chunks = (
-            ciphertext[:size],
-            ciphertext[size : 2 * size],
-            ciphertext[2 * size : 3 * size],
-            ciphertext[3 * size : 4 * size],
+
+def guess_key_size(
+    ciphertext: bytes,
+    num_guesses: int = 1,
+    method: KeySizeMethod = KeySizeMethod.HAMMING,
+) -> list[KeySizeGuess]:
+    """Guess the key size for a repeating-key XOR cipher.
+
+    With KeySizeMethod.HAMMING every key size up to MAX_KEY_SIZE is scored
+    by the Hamming distance between the ciphertext and itself shifted by
+    that size. With KeySizeMethod.COINCIDENCE every shift up to
+    MAX_COINCIDENCE_KEY_SIZE is scored from the ciphertext's
+    self-coincidence, which suits very long keys on long ciphertexts. Both
+    score every size at once with FFTs, and only sizes that leave at least
+    MIN_BLOCK_PAIRS (MIN_COINCIDENCE_BLOCK_PAIRS) block pairs in the
+    ciphertext are considered.
+    """
+    data = as_byte_array(ciphertext)
+    if method == KeySizeMethod.COINCIDENCE:
+        max_size, min_pairs = MAX_COINCIDENCE_KEY_SIZE, MIN_COINCIDENCE_BLOCK_PAIRS
+    else:
+        max_size, min_pairs = MAX_KEY_SIZE, MIN_BLOCK_PAIRS
+    sizes = np.arange(2, min(max_size, data.size // (min_pairs + 1)) + 1)
+    if not sizes.size:
+        return []
+    max_shift = int(sizes[-1])
+
+    if method == KeySizeMethod.COINCIDENCE:
+        scores = 1.0 - coincidence_rates(data, max_shift)[sizes]
+    else:
+        scores = edit_distances(data, max_shift)[sizes]
+
+    # Each score averages over data.size - size pairs
+    noise = np.sqrt(SCORE_VARIANCE_BOUNDS[method] / (data.size - sizes))
+    return rank_key_sizes(sizes, scores, noise)[:num_guesses]
+
+
+def rank_key_sizes(
+    sizes: np.ndarray, scores: np.ndarray, noise: Optional[np.ndarray] = None
+) -> list[KeySizeGuess]:
+    """Rank consecutive key sizes by score, best first.
+
+    `noise` is the standard error of each score, if known; scores within
+    FOLD_STANDARD_ERRORS of it are treated as equal when folding multiples.
+    """
+    if not sizes.size:
+        return []
+    noise = np.zeros(sizes.size) if noise is None else noise
+
+    # How far each size stands out from the rest, in standard deviations
+    spread = scores.std() or 1.0
+    margins = (scores.mean() - scores) / spread
+
+    # Multiples of the key size score as well as the key size itself, so a
+    # size is dropped when one of its divisors scores at least as well, give
+    # or take the noise of the two scores. A divisor that scores clearly
+    # worse never folds a size, and the best size is never dropped.
+    redundant = np.zeros(sizes.size, dtype=bool)
+    for index, size in enumerate(sizes):
+        multiples = np.arange(2 * size, sizes[-1] + 1, size) - sizes[0]
+        tolerance = FOLD_STANDARD_ERRORS * np.hypot(noise[index], noise[multiples])
+        redundant[multiples] |= scores[index] <= scores[multiples] + tolerance
+    redundant[scores.argmin()] = False
+
+    guesses = [
+        KeySizeGuess(float(score), int(size), float(margin))
+        for score, size, margin in zip(
+            scores[~redundant], sizes[~redundant], margins[~redundant]
         )
+    ]
+    guesses.sort()
+    return guesses
+
+
+def edit_distances(data: np.ndarray, max_shift: int) -> np.ndarray:
+    """Average Hamming distance per byte between the data and itself shifted.
+
+    Entry s of the result covers shift s for every s up to `max_shift`, over
+    all pairs data[j], data[j + s]. With one bit plane per bit position,
+    popcount(a ^ b) = popcount(a) + popcount(b) - 2 * (bits set in both),
+    and the last term is the autocorrelation of the bit planes, which one
+    FFT per plane gives for every shift at once, exactly.
+    """
+    n = 1 << (data.size + max_shift).bit_length()  # Large enough not to wrap
+    power = np.zeros(n // 2 + 1)
+    for plane in np.unpackbits(data[:, None], axis=1).T:
+        spectrum = np.fft.rfft(plane, n)
+        power += spectrum.real**2 + spectrum.imag**2
+    both = np.rint(np.fft.irfft(power, n)[: max_shift + 1])
+
+    # Set bits in data[:size - s] and in data[s:], from a running popcount
+    ones = np.concatenate(([0], np.cumsum(POPCOUNT_TABLE[data])))
+    shifts = np.arange(max_shift + 1)
+    pairs = data.size - shifts
+    distances = ones[pairs] + (ones[-1] - ones[shifts]) - 2 * both
+    return distances / np.maximum(pairs, 1)
+
+
+# Every byte value is mapped to a random +/-1 vector, so the dot product of two
+# codes is COINCIDENCE_PLANES for equal bytes and zero on average otherwise
+COINCIDENCE_PLANES = 16
+COINCIDENCE_CODES = np.random.default_rng(0).choice(
+    [-1.0, 1.0], size=(256, COINCIDENCE_PLANES)
+)
+
+
+def coincidence_rates(data: np.ndarray, max_shift: int) -> np.ndarray:
+    """Estimate the fraction of positions j with data[j] == data[j + s].
 
-        # Calculate the Hamming distance between each pair of chunks
-        # This is the sum of the average hamming distance between each pair of chunks
-        chunk_combinations = combinations(chunks, 2)
-        average_distance = sum(
-            hamming_distance(a, b) for a, b in chunk_combinations
-        ) / (sum(1 for _ in chunk_combinations) or 1)
-        return average_distance / size
+    Entry s of the result covers shift s for every s up to `max_shift`. The
+    autocorrelation of each code plane is taken with one FFT, so the cost is
+    O(n log n) in the data length regardless of how many shifts are scored.
+    """
+    n = 1 << (data.size + max_shift).bit_length()  # Large enough not to wrap
+    total = np.zeros(max_shift + 1)
 
-    # Generate scores for key sizes from 2 to MAX_KEY_SIZE
-    scores = [(get_score(size), size) for size in range(2, MAX_KEY_SIZE + 1)]
-    scores.sort()
-    return scores[:num_guesses]
+    for plane in range(COINCIDENCE_PLANES):
+        spectrum = np.fft.rfft(COINCIDENCE_CODES[data, plane], n)
+        total += np.fft.irfft(spectrum * spectrum.conj(), n)[: max_shift + 1]
 
+    pairs = data.size - np.arange(max_shift + 1)
+    return total / (COINCIDENCE_PLANES * np.maximum(pairs, 1))
 
-# This is crucial for finding the repeating XOR key size.
-# It calculates the Hamming distance between two byte strings.
-# The Hamming distance is the number of differing bits between two strings of equal length.
-def hamming_distance(s1: bytes, s2: bytes) -> int:
-    """Calculate the Hamming distance between two byte strings."""
-    if len(s1) != len(s2):
-        raise ValueError("Strings must be of equal length")
 
-    # Count the number of differing bits
-    return sum([hamming_weight(byte) for byte in bytes_xor(s1, s2)])
+# POPCOUNT_TABLE[b] is the number of 1 bits in byte b
+POPCOUNT_TABLE = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).sum(
+    axis=1
+)
 
 
 # This function calculates the Hamming weight of a byte.
 # The Hamming weight is the number of 1 bits in the binary representation of the byte
-def hamming_weight(byte: bytes) -> int:
+def hamming_weight(byte: int) -> int:
     """Calculate the Hamming weight (number of 1 bits) in a byte."""
-    return bin(byte).count("1")
+    return int(POPCOUNT_TABLE[byte])
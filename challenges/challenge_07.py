@@ -8,13 +8,21 @@
 # """
 
 import os
+import timeit
 
 from base64 import b64decode
 from Crypto.Cipher import AES
 from Crypto import Random
+from Crypto.Util import Counter
+from concurrent.futures import ProcessPoolExecutor
 from PIL import Image
+from typing import Optional
+
+from challenges.core.aes import aes_ecb_decrypt, aes_ecb_encrypt, get_ecb_cipher
 
 AES_KEY = b"YELLOW SUBMARINE"  # Fixed 16-byte key for AES in ECB mode
+IMAGE_TILE_SIZE = 1 << 20  # Pixel bytes encrypted per cipher call, a multiple of 16
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif", ".tif", ".tiff")
 
 
 def run_challenge(input_data: str):
@@ -78,32 +86,119 @@ def run_challenge(input_data: str):
     )
 
 
-def aes_ecb_decrypt(ciphertext: bytes, key: bytes) -> bytes:
-    """Decrypt ciphertext using AES in ECB mode with the given key."""
-    cipher = AES.new(key, AES.MODE_ECB)
-    return cipher.decrypt(ciphertext)
-
-
 def encrypt_image(
     image: Image, key: bytes, mode: int = AES.MODE_ECB, iv: bytes = b""
 ) -> Image:
-    image_array = bytes(image.tobytes())
-    padding_length = AES.block_size - len(image_array) % AES.block_size
-    image_array += bytes(
-        padding_length * ".", "UTF-8"
-    )  # Just an arbitrary padding byte
-
-    if mode == AES.MODE_CBC and not iv:
-        raise ValueError("IV must be provided for CBC mode")
-    elif mode not in (AES.MODE_ECB, AES.MODE_CBC):
-        raise ValueError("Unsupported AES mode. Use AES.MODE_ECB or AES.MODE_CBC.")
+    """Encrypt the pixel data of an image so the cipher mode can be seen.
+
+    The pixels are copied out once and then encrypted in place one tile of
+    IMAGE_TILE_SIZE bytes at a time, and the result wraps that same buffer
+    through Image.frombuffer. For CTR mode `iv` is the 8-byte nonce. A
+    trailing partial block is padded, encrypted and truncated again.
+    """
+    if mode in (AES.MODE_CBC, AES.MODE_CTR) and not iv:
+        raise ValueError("IV must be provided for CBC and CTR modes")
+    elif mode not in (AES.MODE_ECB, AES.MODE_CBC, AES.MODE_CTR):
+        raise ValueError(
+            "Unsupported AES mode. Use AES.MODE_ECB, AES.MODE_CBC or AES.MODE_CTR."
+        )
 
     if mode == AES.MODE_CBC:
         aes = AES.new(key, mode, iv)
+    elif mode == AES.MODE_CTR:
+        # Same counter block layout as challenge_10.aes_ctr_transform
+        counter = Counter.new(64, prefix=iv[:8], initial_value=0, little_endian=True)
+        aes = AES.new(key, mode, counter=counter)
     else:
+        # Image keys are usually one-off random keys, which would only evict
+        # the keys that do repeat from the shared cipher cache
         aes = AES.new(key, mode)
 
-    encrypted_image = aes.encrypt(image_array)
-    encrypted_image = encrypted_image[:-padding_length]
+    pixels = bytearray(image.tobytes())
+    view = memoryview(pixels)
+    whole = len(pixels) - len(pixels) % AES.block_size
+
+    # The cipher objects carry CBC and CTR state from one tile to the next
+    for start in range(0, whole, IMAGE_TILE_SIZE):
+        tile = view[start : min(start + IMAGE_TILE_SIZE, whole)]
+        aes.encrypt(tile, output=tile)
+
+    if whole < len(pixels):
+        tail = bytearray(view[whole:])
+        tail += b"." * (AES.block_size - len(tail))  # Just an arbitrary padding byte
+        view[whole:] = aes.encrypt(tail)[: len(pixels) - whole]
+
+    return Image.frombuffer(image.mode, image.size, pixels, "raw", image.mode, 0, 1)
+
+
+def encrypt_image_file(
+    input_path: str, output_path: str, key: bytes, mode: int, iv: bytes = b""
+) -> str:
+    """Worker task: encrypt one image file and save the result.
+
+    A fresh random IV or nonce is drawn for CBC and CTR when none is given.
+    """
+    if not iv and mode == AES.MODE_CBC:
+        iv = Random.new().read(AES.block_size)
+    elif not iv and mode == AES.MODE_CTR:
+        iv = Random.new().read(8)
+
+    with Image.open(input_path) as image:
+        encrypt_image(image.convert("RGB"), key, mode, iv).save(output_path)
+    return output_path
+
+
+def encrypt_image_directory(
+    input_dir: str,
+    output_dir: str,
+    key: bytes,
+    mode: int = AES.MODE_ECB,
+    workers: Optional[int] = None,
+) -> list[str]:
+    """Encrypt every image in a directory across a process pool.
+
+    Encrypted copies are saved as PNG files under `output_dir`, and their
+    paths are returned. Every image gets its own random IV or nonce, since
+    reusing one under the same key would turn CTR into a two-time pad.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    names = sorted(
+        name
+        for name in os.listdir(input_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                encrypt_image_file,
+                os.path.join(input_dir, name),
+                os.path.join(output_dir, f"{os.path.splitext(name)[0]}.png"),
+                key,
+                mode,
+            )
+            for name in names
+        ]
+        return [future.result() for future in futures]
+
+
+def benchmark_cipher_cache(num_calls: int = 100_000) -> tuple[float, float]:
+    """Time one-block ECB encryption with and without the cipher cache.
+
+    Returns the average seconds per call as (uncached, cached).
+    """
+    block = bytes(AES.block_size)
+    uncached = timeit.timeit(
+        lambda: AES.new(AES_KEY, AES.MODE_ECB).encrypt(block), number=num_calls
+    )
+    cached = timeit.timeit(
+        lambda: get_ecb_cipher(AES_KEY).encrypt(block), number=num_calls
+    )
+    return uncached / num_calls, cached / num_calls
+
 
-    return Image.frombytes("RGB", image.size, encrypted_image, "raw", "RGB")
+if __name__ == "__main__":
+    uncached, cached = benchmark_cipher_cache()
+    print(f"⏱️  AES.new per call:         {uncached * 1e6:.2f} µs")
+    print(f"⏱️  get_ecb_cipher per call:  {cached * 1e6:.2f} µs")
+    print(f"💾 Cache: {get_ecb_cipher.cache_info()}")
@@ -7,61 +7,195 @@
 # The challenge is to identify the string with repeated blocks, which is a characteristic of ECB mode
 # """
 
+import heapq
+import mmap
 import os
+import numpy as np
+
+from challenges.core import BytesLike, as_byte_array
+from dataclasses import dataclass
+from itertools import islice
+from typing import Iterator, Optional
 
 BLOCK_SIZE = 16
+CORPUS_BATCH_SIZE = 65536  # Ciphertexts scored per vectorised pass
+BLOCK_HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)  # Odd, so the fold mixes well
 
 
 def run_challenge(input_data: str):
-    """Challenge 8: Detect AES in ECB mode."""
+    """Challenge 8: Detect AES in ECB mode.
+
+    `input_data` may name a file of hex lines to scan instead of the default.
+    """
     print("🔍 Detecting AES in ECB mode...")
 
-    if not input_data:
-        # Load input data from file if not provided
-        with open(f"{os.getcwd()}/challenges/inputs/challenge_08.txt", "r") as f:
-            input_data = f.read().splitlines()
+    input_path = input_data or f"{os.getcwd()}/challenges/inputs/challenge_08.txt"
 
-    print("📥 Input (hex strings):", input_data)
+    print("📥 Input (file):", input_path)
 
     with open(f"{os.getcwd()}/challenges/results/challenge_08.txt", "r") as f:
         expected_result = f.read().strip()
 
     print("🏁 Expected Result (hex):", expected_result)
 
-    ciphertexts = [bytes.fromhex(line.strip()) for line in input_data]
-
-    for index, ciphertext in enumerate(ciphertexts):
-        num_blocks = len(ciphertext) // BLOCK_SIZE
-        num_unique_blocks = len(
-            set(bytes_to_chunks(ciphertext, BLOCK_SIZE))
-        )  # Set will only retrieve unique results
-        num_repeated_blocks = num_blocks - num_unique_blocks
+    candidates = detect_ecb(input_path, top_k=3)
 
+    for candidate in candidates:
         # If there are no repeated blocks, it is likely not ECB mode
-        if num_repeated_blocks == 0:
+        if candidate.repeated_blocks == 0:
             continue
 
         # If we reach this point, we have found a candidate for ECB mode
         print()
-        print("🔑 Found potential ECB mode ciphertext at index:", index)
-        print("   Number of blocks:", num_blocks)
-        print("   Number of unique blocks:", num_unique_blocks)
-        print("   Number of repeated blocks:", num_repeated_blocks)
+        print("🔑 Found potential ECB mode ciphertext at index:", candidate.index)
+        print("   Block offset:", candidate.offset)
+        print("   Number of repeated blocks:", candidate.repeated_blocks)
 
-        if ciphertext.hex() == expected_result:
+        if candidate.ciphertext.hex() == expected_result:
             print("✅ This ciphertext matches the expected result!")
             break
         else:
             print("❌ This ciphertext does not match the expected result.")
 
 
-def bytes_to_chunks(b: bytes, chunk_size: int, quiet_mode=True) -> list[bytes]:
-    """Convert bytes to chunks of a specified size."""
-    chunks = [b[i : i + chunk_size] for i in range(0, len(b), chunk_size)]
+@dataclass
+class ECBCandidate:
+    """Data class to hold a ciphertext ranked by how ECB-like it is."""
+
+    repeated_blocks: int  # Blocks that duplicate an earlier block
+    index: int  # Position of the ciphertext in the corpus
+    offset: int  # Byte offset (0-15) at which the repeated blocks align
+    ciphertext: bytes  # The ciphertext itself
 
-    if not quiet_mode:
-        print(
-            f"🔢 Converted {len(b)} bytes into {len(chunks)} chunks of size {chunk_size} bytes each."
-        )
 
-    return chunks
+def ecb_repetition_scores(ciphertexts: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Count repeated blocks in each row of an (m, length) uint8 array.
+
+    Blocks are read at every byte offset from 0 to BLOCK_SIZE - 1 so that
+    ECB data behind a prefix of any length is found. Returns the best
+    repeat count of each row and the offset it was found at.
+    """
+    rows, length = ciphertexts.shape
+    best = np.zeros(rows, dtype=np.int64)
+    best_offset = np.zeros(rows, dtype=np.int64)
+
+    for offset in range(BLOCK_SIZE):
+        num_blocks = (length - offset) // BLOCK_SIZE
+        if num_blocks < 2:
+            break
+
+        span = np.ascontiguousarray(
+            ciphertexts[:, offset : offset + num_blocks * BLOCK_SIZE]
+        )
+        repeats = count_repeated_blocks(span.view("<u8").reshape(rows, num_blocks, 2))
+
+        improved = repeats > best
+        best[improved] = repeats[improved]
+        best_offset[improved] = offset
+
+    return best, best_offset
+
+
+def count_repeated_blocks(words: np.ndarray) -> np.ndarray:
+    """Count exact duplicate blocks in each row of an (m, n, 2) uint64 array.
+
+    Rows are sorted by a one-word hash of each block, which is much cheaper
+    than sorting by both words. The hash is invertible given the second
+    word, so neighbours with equal hashes and equal second words are equal
+    blocks. Only rows where two different blocks share a hash, and so may
+    not sit next to their duplicates, are sorted by both words instead.
+    """
+    hashes = words[..., 0] * BLOCK_HASH_MULTIPLIER ^ words[..., 1]
+    order = hashes.argsort(axis=1)
+    hashes = np.take_along_axis(hashes, order, axis=1)
+    second = np.take_along_axis(words[..., 1], order, axis=1)
+
+    same_hash = hashes[:, 1:] == hashes[:, :-1]
+    equal = same_hash & (second[:, 1:] == second[:, :-1])
+    repeats = equal.sum(axis=1)
+
+    collided = (same_hash & ~equal).any(axis=1)
+    if collided.any():
+        blocks = words[collided]
+        order = np.lexsort((blocks[..., 1], blocks[..., 0]), axis=-1)
+        blocks = np.take_along_axis(blocks, order[..., None], axis=1)
+        repeats[collided] = (blocks[:, 1:] == blocks[:, :-1]).all(axis=2).sum(axis=1)
+    return repeats
+
+
+def read_corpus_batches(
+    path: str, record_size: Optional[int] = None, batch_size: int = CORPUS_BATCH_SIZE
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Stream a ciphertext corpus as batches of equal-length ciphertexts.
+
+    Each batch is yielded as (corpus indices, (m, length) uint8 array). With
+    `record_size` the file is treated as binary records of that many bytes
+    and memory-mapped, so every batch is a view into the map. Otherwise it
+    is read as hex lines, grouped by length within each batch.
+    """
+    if record_size:
+        if not os.path.getsize(path):
+            return
+        with open(path, "rb") as f:
+            # The map is closed once the last batch view of it is released
+            corpus = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        records = np.frombuffer(corpus, dtype=np.uint8)
+        records = records[: len(records) - len(records) % record_size]
+        records = records.reshape(-1, record_size)
+        for start in range(0, len(records), batch_size):
+            batch = records[start : start + batch_size]
+            yield np.arange(start, start + len(batch)), batch
+        return
+
+    with open(path, "r") as f:
+        first_index = 0
+        while lines := [line.strip() for line in islice(f, batch_size)]:
+            groups: dict[int, list[int]] = {}
+            for position, line in enumerate(lines):
+                if line:
+                    groups.setdefault(len(line), []).append(position)
+
+            for positions in groups.values():
+                joined = bytes.fromhex("".join(lines[p] for p in positions))
+                batch = np.frombuffer(joined, dtype=np.uint8).reshape(
+                    len(positions), -1
+                )
+                yield first_index + np.array(positions), batch
+            first_index += len(lines)
+
+
+def detect_ecb(
+    path: str, top_k: int = 10, record_size: Optional[int] = None
+) -> list[ECBCandidate]:
+    """Rank the ciphertexts in a corpus by repeated blocks, most repeats first."""
+    best: list[tuple[int, int, int, bytes]] = []
+
+    for indices, batch in read_corpus_batches(path, record_size):
+        repeats, offsets = ecb_repetition_scores(batch)
+        for row in np.argsort(-repeats, kind="stable")[:top_k]:
+            entry = (
+                int(repeats[row]),
+                -int(indices[row]),  # Earlier ciphertexts win ties
+                int(offsets[row]),
+                batch[row].tobytes(),
+            )
+            if len(best) < top_k:
+                heapq.heappush(best, entry)
+            elif entry > best[0]:
+                heapq.heapreplace(best, entry)
+
+    return [
+        ECBCandidate(repeated_blocks, -index, offset, ciphertext)
+        for repeated_blocks, index, offset, ciphertext in sorted(best, reverse=True)
+    ]
+
+
+def block_view(b: BytesLike, block_size: int) -> np.ndarray:
+    """View the whole blocks of `b` as an (n, block_size) uint8 array.
+
+    The array shares memory with `b`; a trailing partial block is left out.
+    """
+    data = as_byte_array(b)
+    whole = len(data) - len(data) % block_size
+    return data[:whole].reshape(-1, block_size)
@@ -9,6 +9,8 @@
 
 import os
 
+from challenges.core.padding import PaddingError, pkcs7_pad, pkcs7_unpad
+
 BLOCK_SIZE = 16
 
 
@@ -52,32 +54,3 @@ def run_challenge(input_data: str):
         print("✅ Padding opertions successful!")
     else:
         print("❌ Padding did not match expected result.")
-
-
-class PaddingError(Exception):
-    """Custom exception for padding errors."""
-
-    pass
-
-
-def pkcs7_pad(data: bytes, block_size: int) -> bytes:
-    """Apply PKCS#7 padding to the input data."""
-    if block_size == 16:
-        padding_length = block_size - (len(data) & 15)
-    else:
-        padding_length = block_size - (len(data) % block_size)
-    padding = bytes([padding_length]) * padding_length
-    return data + padding
-
-
-def pkcs7_unpad(data: bytes) -> bytes:
-    """Remove PKCS#7 padding from the input data."""
-
-    padding_length = data[-1]
-    if (
-        padding_length == 0
-        or len(data) < padding_length
-        or data.endswith(bytes([padding_length]) * padding_length) is False
-    ):
-        raise PaddingError
-    return data[:-padding_length]
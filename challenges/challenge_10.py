@@ -6,16 +6,32 @@
 # The challenge is to correctly implement the CBC mode decryption algorithm.
 # """
 
+import argparse
+import mmap
 import os
+import sys
+import traceback
+import numpy as np
 
 from base64 import b64decode
-from challenges.challenge_02 import bytes_xor
-from challenges.challenge_07 import aes_ecb_decrypt
-from challenges.challenge_08 import bytes_to_chunks
-from challenges.challenge_09 import pkcs7_unpad
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from challenges.core import (
+    BytesLike,
+    aes_cbc_decrypt,
+    aes_cbc_decrypt_into,
+    aes_ecb_decrypt,
+    aes_ecb_encrypt,
+    bytes_xor,
+    pkcs7_pad,
+    pkcs7_unpad,
+)
 from Crypto.Cipher import AES
+from typing import BinaryIO, Optional, Union
 
 BLOCK_SIZE = AES.block_size  # AES block size is 16 bytes
+BULK_CHUNK_SIZE = 1 << 22  # Bytes per worker task, a multiple of BLOCK_SIZE
+CTR_BATCH_SIZE = 1 << 20  # Keystream bytes generated per cipher call
 
 
 def run_challenge(input_data: str):
@@ -63,19 +79,307 @@ def run_challenge(input_data: str):
         print("❌ Decryption did not match expected result.")
 
 
-def aes_cbc_decrypt(
-    ciphertext: bytes, key: bytes, iv: bytes, use_pkcs7: bool = True
-) -> bytes:
-    """Decrypts ciphertext using AES in CBC mode."""
-    blocks: list[bytes] = bytes_to_chunks(ciphertext, BLOCK_SIZE)
-    previous_ciphertext: bytes = iv
-    plaintext: bytes = b""
+def bulk_decrypt_file(
+    input_path: str,
+    output_path: str,
+    key: bytes,
+    mode: int = AES.MODE_CBC,
+    iv: bytes = b"",
+    use_pkcs7: bool = True,
+    workers: Optional[int] = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> int:
+    """Decrypt a binary ciphertext file in ECB or CBC mode across a thread pool.
 
-    for block in blocks:
-        raw_decrypted_block: bytes = aes_ecb_decrypt(block, key)
-        plaintext += bytes_xor(raw_decrypted_block, previous_ciphertext)
-        previous_ciphertext = block
+    Both files are memory-mapped and split into block-aligned chunks that are
+    decrypted straight from one map into the other. In CBC mode each chunk
+    only needs the last ciphertext block of the chunk before it as its IV, so
+    the chunks are independent. Returns the length of the plaintext written.
+    """
+    if mode == AES.MODE_CBC and not iv:
+        raise ValueError("IV must be provided for CBC mode")
+    elif mode not in (AES.MODE_ECB, AES.MODE_CBC):
+        raise ValueError("Unsupported AES mode. Use AES.MODE_ECB or AES.MODE_CBC.")
+    if chunk_size <= 0 or chunk_size % BLOCK_SIZE:
+        raise ValueError("Chunk size must be a positive multiple of the block size.")
 
-    if use_pkcs7:
-        plaintext = pkcs7_unpad(plaintext)
-    return plaintext
+    size = os.path.getsize(input_path)
+    if size % BLOCK_SIZE:
+        raise ValueError("Ciphertext length must be a multiple of the block size.")
+    if not size:
+        open(output_path, "wb").close()
+        return 0
+
+    try:
+        with open(input_path, "rb") as source, open(output_path, "w+b") as target:
+            target.truncate(size)
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as source_map:
+                with mmap.mmap(target.fileno(), size) as target_map:
+                    padding_length = decrypt_maps(
+                        source_map,
+                        target_map,
+                        key,
+                        mode,
+                        iv,
+                        use_pkcs7,
+                        workers,
+                        chunk_size,
+                    )
+            target.truncate(size - padding_length)
+    except BaseException:
+        # Never leave a full-size file of garbage behind
+        with suppress(OSError):
+            os.remove(output_path)
+        raise
+
+    return size - padding_length
+
+
+def decrypt_maps(
+    source_map: mmap.mmap,
+    target_map: mmap.mmap,
+    key: bytes,
+    mode: int,
+    iv: bytes,
+    use_pkcs7: bool,
+    workers: Optional[int],
+    chunk_size: int,
+) -> int:
+    """Decrypt one map into another for bulk_decrypt_file; returns the padding length.
+
+    Every view of the maps is released before returning or raising, since
+    a map cannot be closed while views of it exist.
+    """
+    size = len(source_map)
+    with memoryview(source_map) as ciphertext, memoryview(target_map) as plaintext:
+
+        def decrypt_chunk(start: int):
+            end = min(start + chunk_size, size)
+            if mode == AES.MODE_ECB:
+                aes_ecb_decrypt(ciphertext[start:end], key, out=plaintext[start:end])
+            else:
+                chunk_iv = ciphertext[start - BLOCK_SIZE : start] if start else iv
+                aes_cbc_decrypt_into(
+                    ciphertext[start:end], key, chunk_iv, plaintext[start:end]
+                )
+
+        try:
+            # The PyCryptodome and NumPy calls release the GIL, so threads
+            # are enough to use every core
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(decrypt_chunk, range(0, size, chunk_size)))
+
+            if not use_pkcs7:
+                return 0
+            return BLOCK_SIZE - len(pkcs7_unpad(bytes(plaintext[-BLOCK_SIZE:])))
+        except BaseException as e:
+            # The frames of a failed worker still hold slices of the views
+            traceback.clear_frames(e.__traceback__)
+            raise
+
+
+class CBCEncryptor:
+    """Incremental AES-CBC encryption.
+
+    Feed plaintext of any length to update() and call finalize() once at the
+    end. Partial blocks are buffered between calls and PKCS#7 padding is only
+    applied by finalize(), so the full plaintext is never held in memory.
+    """
+
+    def __init__(self, key: bytes, iv: bytes, use_pkcs7: bool = True):
+        # The native CBC cipher carries the chaining block between calls
+        self._cipher = AES.new(key, AES.MODE_CBC, iv)
+        self._use_pkcs7 = use_pkcs7
+        self._buffer = b""
+
+    def update(self, chunk: BytesLike) -> bytes:
+        """Encrypt every whole block available so far."""
+        data = self._buffer + bytes(chunk)
+        whole = len(data) - len(data) % BLOCK_SIZE
+        self._buffer = data[whole:]
+        return self._cipher.encrypt(data[:whole]) if whole else b""
+
+    def finalize(self) -> bytes:
+        """Encrypt the buffered remainder, padding it if enabled."""
+        data, self._buffer = self._buffer, b""
+        if self._use_pkcs7:
+            data = pkcs7_pad(data, BLOCK_SIZE)
+        elif data:
+            raise ValueError("Plaintext length must be a multiple of the block size.")
+        return self._cipher.encrypt(data) if data else b""
+
+
+class CBCDecryptor:
+    """Incremental AES-CBC decryption.
+
+    The mirror of CBCEncryptor. The last block is held back until
+    finalize(), since only then is it known to carry the PKCS#7 padding.
+    """
+
+    def __init__(self, key: bytes, iv: bytes, use_pkcs7: bool = True):
+        self._key = key
+        self._previous = bytes(iv)  # Chaining block for the next call
+        self._use_pkcs7 = use_pkcs7
+        self._buffer = b""
+
+    def update(self, chunk: BytesLike) -> bytes:
+        """Decrypt every whole block that cannot be the final one."""
+        data = self._buffer + bytes(chunk)
+        held = len(data) % BLOCK_SIZE or (BLOCK_SIZE if self._use_pkcs7 else 0)
+        ready = len(data) - held
+        self._buffer = data[ready:]
+        return self._decrypt(data[:ready])
+
+    def finalize(self) -> bytes:
+        """Decrypt the held-back block and strip its padding if enabled."""
+        data, self._buffer = self._buffer, b""
+        if len(data) % BLOCK_SIZE or (self._use_pkcs7 and not data):
+            raise ValueError("Ciphertext length must be a multiple of the block size.")
+
+        plaintext = self._decrypt(data)
+        return pkcs7_unpad(plaintext) if self._use_pkcs7 else plaintext
+
+    def _decrypt(self, ciphertext: bytes) -> bytes:
+        if not ciphertext:
+            return b""
+        plaintext = memoryview(bytearray(len(ciphertext)))
+        aes_cbc_decrypt_into(ciphertext, self._key, self._previous, plaintext)
+        self._previous = ciphertext[-BLOCK_SIZE:]
+        return plaintext.tobytes()
+
+
+def cbc_stream(
+    source: BinaryIO,
+    target: BinaryIO,
+    transformer: Union[CBCEncryptor, CBCDecryptor],
+    chunk_size: int = BULK_CHUNK_SIZE,
+) -> int:
+    """Pump a file or pipe through a CBC transformer in fixed-size chunks.
+
+    Returns the number of bytes written to `target`.
+    """
+    written = 0
+    for chunk in iter(lambda: source.read(chunk_size), b""):
+        written += target.write(transformer.update(chunk))
+    written += target.write(transformer.finalize())
+    target.flush()
+    return written
+
+
+def ctr_keystream(key: bytes, nonce: int, first_block: int, num_blocks: int) -> bytes:
+    """Keystream for `num_blocks` CTR blocks starting at block `first_block`.
+
+    Counter blocks are laid out as a 64-bit little-endian nonce followed by a
+    64-bit little-endian block counter. They are built as one NumPy array
+    and ECB-encrypted in a single cipher call.
+    """
+    counter_blocks = np.empty((num_blocks, 2), dtype="<u8")
+    counter_blocks[:, 0] = nonce
+    counter_blocks[:, 1] = np.arange(first_block, first_block + num_blocks)
+    return aes_ecb_encrypt(counter_blocks.tobytes(), key)
+
+
+def aes_ctr_transform(
+    data: BytesLike,
+    key: bytes,
+    nonce: int = 0,
+    offset: int = 0,
+    out: Optional[Union[bytearray, memoryview]] = None,
+) -> Union[bytes, bytearray, memoryview]:
+    """Encrypt or decrypt data in AES-CTR mode, which are the same operation.
+
+    `offset` is the position of data[0] within the whole stream, so any
+    slice of a CTR stream can be processed on its own without generating
+    the keystream before it. Keystream is generated CTR_BATCH_SIZE bytes at
+    a time and XORed with the data one batch at a time.
+    """
+    data = memoryview(data)
+    result = memoryview(bytearray(len(data)) if out is None else out)
+    if len(result) != len(data):
+        raise ValueError("Output buffer must match the data length.")
+
+    position = 0
+    while position < len(data):
+        stream_offset = offset + position
+        skip = stream_offset % BLOCK_SIZE  # Keystream bytes before the data
+        length = min(len(data) - position, CTR_BATCH_SIZE - skip)
+
+        num_blocks = -(-(skip + length) // BLOCK_SIZE)
+        keystream = ctr_keystream(key, nonce, stream_offset // BLOCK_SIZE, num_blocks)
+
+        window = slice(position, position + length)
+        bytes_xor(
+            data[window],
+            memoryview(keystream)[skip : skip + length],
+            out=result[window],
+        )
+        position += length
+
+    return result.tobytes() if out is None else out
+
+
+def main():
+    """Command-line entry point for file and pipe encryption and decryption."""
+    parser = argparse.ArgumentParser(
+        description="AES ECB/CBC file encryption and decryption",
+        epilog=(
+            "Example: python -m challenges.challenge_10 cipher.bin plain.bin --mode cbc\n"
+            "         cat plain.txt | python -m challenges.challenge_10 - - --encrypt"
+        ),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("input", help="Input file, or - for stdin")
+    parser.add_argument("output", help="Output file, or - for stdout")
+    parser.add_argument(
+        "--key",
+        default="YELLOW SUBMARINE",
+        help="AES key as text (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--iv", default="00" * BLOCK_SIZE, help="CBC IV as hex (default: all zeros)"
+    )
+    parser.add_argument("--mode", choices=["ecb", "cbc"], default="cbc")
+    parser.add_argument("--encrypt", action="store_true", help="Encrypt (CBC only)")
+    parser.add_argument("--workers", type=int, help="Number of worker threads")
+    parser.add_argument(
+        "--no-unpad", action="store_true", help="Keep or skip the PKCS#7 padding"
+    )
+    args = parser.parse_args()
+
+    key, iv = args.key.encode("utf-8"), bytes.fromhex(args.iv)
+    streaming = args.encrypt or "-" in (args.input, args.output)
+
+    if not streaming:
+        mode = AES.MODE_ECB if args.mode == "ecb" else AES.MODE_CBC
+        written = bulk_decrypt_file(
+            args.input,
+            args.output,
+            key,
+            mode,
+            iv,
+            use_pkcs7=not args.no_unpad,
+            workers=args.workers,
+        )
+        print(f"🔓 Decrypted {written} bytes into {args.output}", file=sys.stderr)
+        return
+
+    if args.mode != "cbc":
+        parser.error("Streaming is only supported in CBC mode")
+
+    transformer_type = CBCEncryptor if args.encrypt else CBCDecryptor
+    transformer = transformer_type(key, iv, use_pkcs7=not args.no_unpad)
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    target = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        written = cbc_stream(source, target, transformer)
+    finally:
+        for f in (source, target):
+            if f not in (sys.stdin.buffer, sys.stdout.buffer):
+                f.close()
+
+    action = "Encrypted" if args.encrypt else "Decrypted"
+    print(f"🔐 {action} {written} bytes into {args.output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
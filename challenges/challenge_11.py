@@ -6,21 +6,29 @@
 # The challenge is to correctly implement the detection algorithm
 # """
 
-import os
-from random import choice, randint
-from typing import Callable
+import numpy as np
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from random import Random, SystemRandom
+from time import perf_counter
+from typing import Optional
 from Crypto.Cipher import AES
 from enum import Enum
 
-from challenges.challenge_08 import bytes_to_chunks
-from challenges.challenge_09 import pkcs7_pad
+from challenges.core import (
+    EncryptionOracleType,
+    InstrumentedOracle,
+    OracleStats,
+    iter_blocks,
+    pkcs7_pad,
+)
 
-EncryptionOracleType = Callable[
-    [bytes], bytes
-]  # Take one bytes argument and return bytes
 BLOCK_SIZE = AES.block_size  # AES block size is 16 bytes
 KEY_SIZE = 32  # AES key size is 32 bytes for AES-256
 MIN_PREFIX_LENGTH = 5
+TRIAL_BATCH_SIZE = 10_000  # Trials per worker task, each with its own seed
+LATENCY_PERCENTILES = (50, 90, 99, 100)
 
 
 class AESMode(Enum):
@@ -29,35 +37,145 @@ class AESMode(Enum):
 
 
 def run_challenge(input_data: str):
-    """Challenge 11: An ECB/CBC detection oracle."""
-    print("🔍 Implementing ECB/CBC detection oracle...")
-
-    for _ in range(1000):
-        _mode, oracle = get_encryption_oracle()
-        guess = detector(oracle)
-
-        if guess != _mode:
-            print(f"❌ Detection failed! Expected {_mode}, but got {guess}.")
-        else:
-            print(f"✅ Detection successful! Mode: {guess}.")
-
-    print("🏁 All guesses were successful")
+    """Challenge 11: An ECB/CBC detection oracle.
 
+    `input_data` may give the number of trials to run instead of 1000.
+    """
+    print("🔍 Implementing ECB/CBC detection oracle...")
 
-def get_encryption_oracle() -> tuple[AESMode, EncryptionOracleType]:
-    mode = choice([AESMode.ECB, AESMode.CBC])
+    num_trials = int(input_data) if input_data else 1000
+    report = run_trials(num_trials)
+
+    print(f"🎲 Ran {report.trials} trials")
+    print("📊 Confusion matrix (actual → guessed):")
+    for actual in AESMode:
+        row = ", ".join(
+            f"{guessed.value}: {report.confusion[actual][guessed]}"
+            for guessed in AESMode
+        )
+        print(f"   {actual.value} → {row}")
+    print(f"🎯 Accuracy: {report.accuracy:.4%}")
+    print(
+        "⏱️  Trial latency: "
+        + ", ".join(
+            f"p{percentile}: {seconds * 1e6:.1f} µs"
+            for percentile, seconds in report.latency_percentiles.items()
+        )
+    )
+    print("📊 Oracle:", report.oracle_stats.summary())
+
+    if report.accuracy == 1.0:
+        print("🏁 All guesses were successful")
+    else:
+        print("❌ Some guesses were wrong")
+
+
+@dataclass
+class TrialReport:
+    """Data class to hold the aggregated results of detector trials."""
+
+    trials: int  # Number of trials run
+    confusion: dict[AESMode, dict[AESMode, int]]  # actual -> guessed -> count
+    latency_percentiles: dict[int, float]  # Percentile -> seconds per trial
+    oracle_stats: OracleStats  # Work done by every trial's oracle
+
+    @property
+    def accuracy(self) -> float:
+        correct = sum(self.confusion[mode][mode] for mode in AESMode)
+        return correct / self.trials if self.trials else 0.0
+
+
+def run_trial_batch(
+    num_trials: int, seed: int
+) -> tuple[np.ndarray, np.ndarray, OracleStats]:
+    """Worker task: run trials with a seeded RNG and no output.
+
+    Returns a confusion matrix indexed by list(AESMode) positions, the
+    latency of every trial in seconds, and the oracle statistics.
+    """
+    rng = Random(seed)
+    modes = list(AESMode)
+    confusion = np.zeros((len(modes), len(modes)), dtype=np.int64)
+    latencies = np.empty(num_trials)
+    stats = OracleStats()
+
+    for trial in range(num_trials):
+        start = perf_counter()
+        mode, oracle = get_encryption_oracle(rng)
+        guess = detector(InstrumentedOracle(oracle, stats))
+        latencies[trial] = perf_counter() - start
+        confusion[modes.index(mode), modes.index(guess)] += 1
+
+    return confusion, latencies, stats
+
+
+def run_trials(
+    num_trials: int,
+    workers: Optional[int] = None,
+    seed: int = 0,
+    batch_size: int = TRIAL_BATCH_SIZE,
+) -> TrialReport:
+    """Run the detector against many random oracles across a process pool.
+
+    Trials are split into batches, and batch i is seeded with seed + i, so a
+    run is reproducible whatever the number of workers.
+    """
+    modes = list(AESMode)
+    confusion = np.zeros((len(modes), len(modes)), dtype=np.int64)
+    latencies = []
+    stats = OracleStats()
+
+    batches = [
+        (min(batch_size, num_trials - start), seed + index)
+        for index, start in enumerate(range(0, num_trials, batch_size))
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch_confusion, batch_latencies, batch_stats in executor.map(
+            run_trial_batch, *zip(*batches)
+        ):
+            confusion += batch_confusion
+            latencies.append(batch_latencies)
+            stats.merge(batch_stats)
+
+    latencies = np.concatenate(latencies) if latencies else np.zeros(1)
+    return TrialReport(
+        trials=num_trials,
+        confusion={
+            actual: {guessed: int(confusion[i, j]) for j, guessed in enumerate(modes)}
+            for i, actual in enumerate(modes)
+        },
+        latency_percentiles={
+            percentile: float(np.percentile(latencies, percentile))
+            for percentile in LATENCY_PERCENTILES
+        },
+        oracle_stats=stats,
+    )
+
+
+def get_encryption_oracle(
+    rng: Optional[Random] = None,
+) -> tuple[AESMode, EncryptionOracleType]:
+    """Create an oracle that encrypts under a randomly chosen mode.
+
+    Pass `rng` to draw the mode, keys and padding from a seeded generator
+    instead of the system's randomness.
+    """
+    rng = rng or SystemRandom()
+    mode = rng.choice([AESMode.ECB, AESMode.CBC])
 
     def encryption_oracle(plaintext: bytes) -> bytes:
         """Encrypts plaintext using either ECB or CBC mode."""
-        key = os.urandom(KEY_SIZE)
-        prefix = os.urandom(randint(5, 10))
-        suffix = os.urandom(randint(5, 10))
+        key = rng.randbytes(KEY_SIZE)
+        prefix = rng.randbytes(rng.randint(5, 10))
+        suffix = rng.randbytes(rng.randint(5, 10))
         plaintext = pkcs7_pad(prefix + plaintext + suffix, BLOCK_SIZE)
 
         if mode == AESMode.ECB:
+            # A fresh random key every call would only evict the keys that
+            # do repeat from the shared cipher cache
             cipher = AES.new(key, AES.MODE_ECB)
         else:  # AESMode.CBC
-            iv = os.urandom(BLOCK_SIZE)
+            iv = rng.randbytes(BLOCK_SIZE)
             cipher = AES.new(key, AES.MODE_CBC, iv)
 
         return cipher.encrypt(plaintext)
@@ -65,14 +183,18 @@ def get_encryption_oracle() -> tuple[AESMode, EncryptionOracleType]:
     return mode, encryption_oracle
 
 
-def detector(func: EncryptionOracleType) -> AESMode:
-    """Detects whether the encryption oracle uses ECB or CBC mode."""
-    plaintext = bytes(
+def detector_probe() -> bytes:
+    """The plaintext the detector sends to its oracle."""
+    return bytes(
         2 * BLOCK_SIZE + (BLOCK_SIZE - MIN_PREFIX_LENGTH)
     )  # Create a plaintext that will produce two identical blocks in ECB mode
-    print(plaintext)
+
+
+def detector(func: EncryptionOracleType) -> AESMode:
+    """Detects whether the encryption oracle uses ECB or CBC mode."""
+    plaintext = detector_probe()
     ciphertext = func(plaintext)
-    chunked_blocks = bytes_to_chunks(ciphertext, BLOCK_SIZE)
+    chunked_blocks = list(iter_blocks(ciphertext, BLOCK_SIZE))
 
     # Check for identical blocks
     if chunked_blocks[1] == chunked_blocks[2]:
@@ -11,16 +11,20 @@ from time import sleep
 import os
 
 from base64 import b64decode
-from typing import Callable
 from Crypto.Cipher import AES
 from itertools import count
 
-from challenges.challenge_08 import bytes_to_chunks
-from challenges.challenge_09 import pkcs7_pad
+from challenges.core import (
+    EncryptionOracleType,
+    InstrumentedOracle,
+    MemoizingOracle,
+    OracleCache,
+    get_ecb_cipher,
+    iter_blocks,
+    pkcs7_pad,
+    query_blocks,
+)
 
-EncryptionOracleType = Callable[
-    [bytes], bytes
-]  # Take one bytes argument and return bytes
 BLOCK_SIZE = AES.block_size  # AES block size is 16 bytes
 KEY_SIZE = 32  # AES key size is 32 bytes for AES-256
 
@@ -29,11 +33,15 @@ def run_challenge(input_data: str):
     """Challenge 12: Byte-at-a-time ECB decryption (Simple)"""
     print("🔍 Implementing byte-at-a-time ECB decryption...")
 
-    oracle = make_encryption_oracle()
+    # Every query that reaches the real oracle is measured, and repeated
+    # queries from any step are answered from one shared cache
+    oracle = InstrumentedOracle(make_encryption_oracle())
+    cache = OracleCache()
+    cached_oracle = MemoizingOracle(oracle, cache)
 
     print("Step 1: Determine block size and postfix length")
 
-    block_size, postfix_length = find_block_size_and_postfix_length(oracle)
+    block_size, postfix_length = find_block_size_and_postfix_length(cached_oracle)
     print(f"Block size: {block_size} bytes")
     print(f"Postfix length: {postfix_length} bytes")
     assert block_size == BLOCK_SIZE, "Block size does not match AES block size"
@@ -42,30 +50,35 @@ def run_challenge(input_data: str):
     print("✅ Step 1 completed successfully.")
 
     print("Step 2: Detect if the oracle is using ECB mode")
-    assert detect_ecb_mode(oracle), "Oracle is not using ECB mode"
+    assert detect_ecb_mode(cached_oracle), "Oracle is not using ECB mode"
 
     print("✅ Step 2 completed successfully.")
 
-    print("Step 3: Create a transposed/flattened list of ciphertexts")
+    print("Step 3: Guess each byte of the secret postfix, one candidate per query")
 
-    ciphertexts = [
-        bytes_to_chunks(oracle(bytes(15 - i)), BLOCK_SIZE) for i in range(BLOCK_SIZE)
-    ]
-    transposed_ciphertext = [block for blocks in zip(*ciphertexts) for block in blocks]
-    blocks_to_attack = transposed_ciphertext[:postfix_length]
+    classic_oracle = InstrumentedOracle(oracle)
+    postfix = byte_at_a_time_classic(
+        MemoizingOracle(classic_oracle, cache), postfix_length
+    )
 
     print("✅ Step 3 completed successfully.")
+    print("Decrypted Postfix:", postfix.decode("utf-8", errors="ignore"))
 
-    print("Step 4: Guess each byte of the secret postfix")
-    postfix = bytes(15)
-    for block in blocks_to_attack:
-        postfix += guess_byte(postfix[-15:], block, oracle)
-        print(postfix[15:])
-        # sleep(0.1)  # Sleep for fun
-    postfix = postfix[15:]
+    print("Step 4: Guess each byte of the secret postfix, all candidates per query")
+
+    batched_oracle = InstrumentedOracle(oracle)
+    batched_postfix = byte_at_a_time_batched(
+        MemoizingOracle(batched_oracle, cache), postfix_length
+    )
+    assert batched_postfix == postfix, "Batched attack disagrees with classic attack"
 
     print("✅ Step 4 completed successfully.")
-    print("Decrypted Postfix:", postfix.decode("utf-8", errors="ignore"))
+    print("📊 Classic:", classic_oracle.stats.summary())
+    print("📊 Batched:", batched_oracle.stats.summary())
+    print("📊 Total:", oracle.stats.summary())
+    print("⏱️  Latency:", oracle.stats.histogram())
+    print("🗃️  Oracle cache:", cache.summary())
+    print("💾 Cipher cache:", get_ecb_cipher.cache_info())
 
     with open(f"{os.getcwd()}/challenges/results/challenge_12.txt", "r") as f:
         expected_result = f.read().strip()
@@ -85,7 +98,7 @@ def make_encryption_oracle() -> EncryptionOracleType:
 
     def encryption_oracle(plaintext: bytes) -> bytes:
         """Encrypts plaintext using AES in ECB mode."""
-        cipher = AES.new(_key, AES.MODE_ECB)
+        cipher = get_ecb_cipher(_key)
         padded_plaintext = pkcs7_pad(plaintext + _secret_postfix, BLOCK_SIZE)
         return cipher.encrypt(padded_plaintext)
 
@@ -97,9 +110,11 @@ def find_block_size_and_postfix_length(oracle: EncryptionOracleType) -> tuple[in
     block_size = None
     postfix_length = None
 
-    l = len(oracle(b"A"))
+    # Probe with zero bytes, as the later steps do, so that a MemoizingOracle
+    # can answer their overlapping queries
+    l = len(oracle(bytes(1)))
     for i in count(2):
-        l2 = len(oracle(b"A" * i))
+        l2 = len(oracle(bytes(i)))
         if l2 > l:
             block_size = l2 - l
             postfix_length = l - i
@@ -112,17 +127,69 @@ def find_block_size_and_postfix_length(oracle: EncryptionOracleType) -> tuple[in
 
 def detect_ecb_mode(oracle: EncryptionOracleType) -> bool:
     """Detect if the oracle is using ECB mode."""
-    ciphertext = oracle(b"A" * (2 * BLOCK_SIZE))
-    chunks = bytes_to_chunks(ciphertext, BLOCK_SIZE)
-    if chunks[0] == chunks[1]:
+    ciphertext = query_blocks(oracle, bytes(2 * BLOCK_SIZE), 2)
+    chunks = iter_blocks(ciphertext, BLOCK_SIZE)
+    if next(chunks) == next(chunks):
         return True
     return False
 
 
+def byte_at_a_time_classic(oracle: EncryptionOracleType, postfix_length: int) -> bytes:
+    """Recover the secret postfix, trying one candidate byte per oracle query."""
+    # Create a transposed/flattened list of ciphertext blocks, where block i
+    # ends with byte i of the postfix
+    ciphertexts = [
+        list(iter_blocks(oracle(bytes(15 - i)), BLOCK_SIZE)) for i in range(BLOCK_SIZE)
+    ]
+    transposed_ciphertext = [block for blocks in zip(*ciphertexts) for block in blocks]
+    blocks_to_attack = transposed_ciphertext[:postfix_length]
+
+    postfix = bytearray(15)
+    for block in blocks_to_attack:
+        postfix += guess_byte(postfix[-15:], block, oracle)
+    return bytes(postfix[15:])
+
+
+def byte_at_a_time_batched(oracle: EncryptionOracleType, postfix_length: int) -> bytes:
+    """Recover the secret postfix with exactly one oracle query per byte.
+
+    ECB encrypts every block on its own, so each query carries all 256
+    candidate blocks for the next byte followed by the alignment padding
+    that places that byte at the end of a target block. The candidate
+    ciphertexts form a dictionary from block to byte, and the target block is
+    looked up in it.
+    """
+    candidates_length = 256 * BLOCK_SIZE
+    postfix = bytearray(15)
+
+    for i in range(postfix_length):
+        prefix = postfix[-15:]
+        query = bytearray(candidates_length + 15 - i % BLOCK_SIZE)
+        for b in range(256):
+            query[b * BLOCK_SIZE : (b + 1) * BLOCK_SIZE - 1] = prefix
+            query[(b + 1) * BLOCK_SIZE - 1] = b
+
+        ciphertext = oracle(bytes(query))
+        candidates = {
+            block.tobytes(): b
+            for b, block in enumerate(
+                iter_blocks(ciphertext[:candidates_length], BLOCK_SIZE)
+            )
+        }
+
+        target_start = candidates_length + (i // BLOCK_SIZE) * BLOCK_SIZE
+        target = ciphertext[target_start : target_start + BLOCK_SIZE]
+        if target not in candidates:
+            raise ValueError("No matching byte found")
+        postfix.append(candidates[target])
+
+    return bytes(postfix[15:])
+
+
 def guess_byte(prefix: bytes, target: bytes, oracle: EncryptionOracleType) -> bytes:
     """Guess a single byte of the secret postfix."""
     for b in range(256):
         guess = prefix + bytes([b])
-        if oracle(guess)[:BLOCK_SIZE] == target:
+        if query_blocks(oracle, guess, 1) == target:
             return bytes([b])
     raise ValueError("No matching byte found")
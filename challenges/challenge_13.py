@@ -10,11 +10,11 @@
 import os
 
 from Crypto.Cipher import AES
+from functools import lru_cache
 
-from challenges.challenge_09 import pkcs7_pad, pkcs7_unpad
+from challenges.core import get_ecb_cipher, pkcs7_pad, pkcs7_unpad
 
 KEY_SIZE = 32  # AES key size is 32 bytes for AES-256
-_key = os.urandom(KEY_SIZE)  # Randomly generated key for AES encryption
 
 
 def run_challenge(input_data: str):
@@ -109,14 +109,20 @@ def profile_for(email: bytes) -> bytes:
     return profile
 
 
+@lru_cache(maxsize=None)
+def get_key() -> bytes:
+    """The random AES key of this process, generated on first use."""
+    return os.urandom(KEY_SIZE)
+
+
 def encrypt_profile(email: bytes) -> bytes:
     """Encrypt the profile string for the given email."""
     profile = profile_for(email)
-    cipher = AES.new(_key, AES.MODE_ECB)
+    cipher = get_ecb_cipher(get_key())
     return cipher.encrypt(pkcs7_pad(profile, AES.block_size))
 
 
 def decrypt_profile(ciphertext: bytes) -> bytes:
     """Decrypt the profile string for the given email."""
-    cipher = AES.new(_key, AES.MODE_ECB)
+    cipher = get_ecb_cipher(get_key())
     return pkcs7_unpad(cipher.decrypt(ciphertext))
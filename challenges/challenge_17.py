@@ -0,0 +1,283 @@
+# https://cryptopals.com/sets/3/challenges/17
+
+# """Challenge 17: The CBC padding oracle
+# This challenge involves decrypting CBC ciphertexts using only a padding oracle.
+# The oracle decrypts a ciphertext and reveals nothing but whether its PKCS#7 padding is valid.
+# The challenge is to recover every plaintext byte by forging the block before it and asking
+# the oracle which forgery produces valid padding.
+# """
+
+import os
+import threading
+
+from base64 import b64decode
+from concurrent.futures import ThreadPoolExecutor
+from Crypto.Cipher import AES
+from string import digits, punctuation
+from time import perf_counter
+from typing import Callable, Optional
+
+from challenges.core import (
+    OracleStats,
+    PaddingError,
+    aes_cbc_decrypt,
+    iter_blocks,
+    pkcs7_pad,
+    pkcs7_unpad,
+)
+
+# Take an IV followed by a ciphertext and say whether its padding is valid
+PaddingOracleType = Callable[[bytes], bool]
+BatchPaddingOracleType = Callable[[list[bytes]], list[bool]]  # Many queries per call
+BLOCK_SIZE = AES.block_size  # AES block size is 16 bytes
+KEY_SIZE = 32  # AES key size is 32 bytes for AES-256
+PROBE_BATCH_SIZE = 16  # Candidate bytes sent to the oracle per call
+
+# Byte values in the order they are guessed: English text first, then the
+# padding values, then everything else
+ENGLISH_ORDER = (
+    " etaoinshrdlcumwfgypbvkjxqz"
+    + "ETAOINSHRDLCUMWFGYPBVKJXQZ"
+    + digits
+    + ".,'\"-!?;:"
+    + "\n"
+).encode("ascii")
+PRINTABLE_ORDER = ENGLISH_ORDER + bytes(
+    b for b in (punctuation + "\t\r").encode("ascii") if b not in ENGLISH_ORDER
+)
+PADDING_ORDER = bytes(range(1, BLOCK_SIZE + 1))
+CANDIDATE_ORDER = (
+    PRINTABLE_ORDER
+    + PADDING_ORDER
+    + bytes(b for b in range(256) if b not in PRINTABLE_ORDER + PADDING_ORDER)
+)
+# The final block ends in padding, so those values are tried first there
+FINAL_BLOCK_ORDER = PADDING_ORDER + bytes(
+    b for b in CANDIDATE_ORDER if b not in PADDING_ORDER
+)
+NATURAL_ORDER = bytes(range(256))
+
+
+def run_challenge(input_data: str):
+    """Challenge 17: The CBC padding oracle."""
+    print("🔍 Implementing the CBC padding oracle attack...")
+
+    if not input_data:
+        with open(f"{os.getcwd()}/challenges/inputs/challenge_17.txt", "r") as f:
+            input_data = f.read().strip()
+
+    secrets = [b64decode(line) for line in input_data.splitlines() if line.strip()]
+    print(f"📥 Input: {len(secrets)} base64 secrets")
+
+    with open(f"{os.getcwd()}/challenges/results/challenge_17.txt", "r") as f:
+        expected_result = f.read().strip()
+
+    encrypt, padding_oracle = make_padding_oracle()
+    messages = [encrypt(secret) for secret in secrets]
+
+    print("Step 1: Recover one block at a time, candidates in byte order")
+
+    naive_stats = OracleStats()
+    start = perf_counter()
+    naive = [
+        padding_oracle_attack(
+            iv,
+            ciphertext,
+            batch_padding_oracle(padding_oracle, naive_stats),
+            batch_size=1,
+            workers=1,
+            order=NATURAL_ORDER,
+        )
+        for iv, ciphertext in messages
+    ]
+    naive_seconds = perf_counter() - start
+
+    print("✅ Step 1 completed successfully.")
+
+    print("Step 2: Recover all blocks in parallel, likely candidates in batches")
+
+    stats = OracleStats()
+    start = perf_counter()
+    plaintexts = [
+        padding_oracle_attack(
+            iv, ciphertext, batch_padding_oracle(padding_oracle, stats)
+        )
+        for iv, ciphertext in messages
+    ]
+    seconds = perf_counter() - start
+    assert plaintexts == naive, "Batched attack disagrees with the naive attack"
+
+    print("✅ Step 2 completed successfully.")
+
+    recovered = "\n".join(
+        plaintext.decode("utf-8", errors="ignore") for plaintext in plaintexts
+    )
+    print("Decrypted Secrets:")
+    print(recovered)
+
+    kilobytes = sum(len(ciphertext) for _, ciphertext in messages) / 1024
+    for name, attack_stats, attack_seconds in (
+        ("Naive", naive_stats, naive_seconds),
+        ("Batched", stats, seconds),
+    ):
+        print(
+            f"📊 {name}: {attack_stats.queries} oracle calls "
+            f"({attack_stats.queries / kilobytes:.0f}/KB), "
+            f"{attack_seconds * 1e3 / kilobytes:.1f} ms/KB"
+        )
+
+    if recovered == expected_result:
+        print("✅ Decryption successful!")
+    else:
+        print("❌ Decryption did not match expected result.")
+
+
+def make_padding_oracle(
+    key: Optional[bytes] = None,
+) -> tuple[Callable[[bytes], tuple[bytes, bytes]], PaddingOracleType]:
+    """Create an encryption function and the padding oracle for its key.
+
+    The encryption function pads and encrypts a plaintext under a fresh IV
+    and returns (iv, ciphertext). The oracle takes an IV followed by a
+    ciphertext and only says whether the padding was valid.
+    """
+    key = key or os.urandom(KEY_SIZE)
+
+    def encrypt(plaintext: bytes) -> tuple[bytes, bytes]:
+        iv = os.urandom(BLOCK_SIZE)
+        cipher = AES.new(key, AES.MODE_CBC, iv)
+        return iv, cipher.encrypt(pkcs7_pad(plaintext, BLOCK_SIZE))
+
+    def padding_oracle(message: bytes) -> bool:
+        try:
+            aes_cbc_decrypt(message[BLOCK_SIZE:], key, message[:BLOCK_SIZE])
+        except PaddingError:
+            return False
+        return True
+
+    return encrypt, padding_oracle
+
+
+def batch_padding_oracle(
+    oracle: PaddingOracleType, stats: Optional[OracleStats] = None
+) -> BatchPaddingOracleType:
+    """Adapt a single-query padding oracle to answer batches of queries.
+
+    A remote oracle would take the whole batch in one round trip instead.
+    Every query is recorded in `stats` when it is given, with the time of
+    the batch shared between its queries.
+    """
+    lock = threading.Lock()
+
+    def query(messages: list[bytes]) -> list[bool]:
+        start = perf_counter()
+        answers = [oracle(message) for message in messages]
+        if stats is not None:
+            seconds = (perf_counter() - start) / len(messages)
+            with lock:
+                for message in messages:
+                    stats.record(len(message), 1, seconds)
+        return answers
+
+    return query
+
+
+def recover_block(
+    previous: bytes,
+    block: bytes,
+    oracle: BatchPaddingOracleType,
+    batch_size: int = PROBE_BATCH_SIZE,
+    order: bytes = CANDIDATE_ORDER,
+) -> bytes:
+    """Recover the plaintext of one CBC block from the block before it.
+
+    The plaintext is found from the last byte backwards. For padding length
+    n, the bytes after position 16 - n are forged to decrypt to n, and each
+    candidate g for the byte at 16 - n is tried by XORing g ^ n into the
+    previous block there. Candidates go to the oracle `batch_size` at a
+    time in `order`, and the first valid one in that order is taken.
+    """
+    plaintext = bytearray(BLOCK_SIZE)
+
+    for padding_length in range(1, BLOCK_SIZE + 1):
+        position = BLOCK_SIZE - padding_length
+        forged = bytearray(previous)
+        for i in range(position + 1, BLOCK_SIZE):
+            forged[i] ^= plaintext[i] ^ padding_length
+
+        plaintext[position] = find_byte(
+            forged, block, position, padding_length, oracle, batch_size, order
+        )
+
+    return bytes(plaintext)
+
+
+def find_byte(
+    forged: bytearray,
+    block: bytes,
+    position: int,
+    padding_length: int,
+    oracle: BatchPaddingOracleType,
+    batch_size: int,
+    order: bytes,
+) -> int:
+    """Find the plaintext byte at `position` given a forged previous block."""
+    original = forged[position]
+
+    def probe(guess: int) -> bytes:
+        forged[position] = original ^ guess ^ padding_length
+        return bytes(forged) + block
+
+    for start in range(0, len(order), batch_size):
+        guesses = order[start : start + batch_size]
+        answers = oracle([probe(guess) for guess in guesses])
+
+        for guess, valid in zip(guesses, answers):
+            if not valid:
+                continue
+            if padding_length == 1 and position:
+                # A valid last byte may also end in \x02\x02 and so on, so
+                # change the byte before it and make sure it is still valid
+                forged[position - 1] ^= 0xFF
+                confirmed = oracle([probe(guess)])[0]
+                forged[position - 1] ^= 0xFF
+                if not confirmed:
+                    continue
+            forged[position] = original
+            return guess
+
+    raise ValueError(f"No candidate gave valid padding at byte {position}")
+
+
+def padding_oracle_attack(
+    iv: bytes,
+    ciphertext: bytes,
+    oracle: BatchPaddingOracleType,
+    batch_size: int = PROBE_BATCH_SIZE,
+    workers: Optional[int] = None,
+    order: bytes = CANDIDATE_ORDER,
+) -> bytes:
+    """Decrypt a CBC ciphertext with a padding oracle and remove its padding.
+
+    Each block only depends on the ciphertext block before it, so all blocks
+    are recovered independently across a thread pool; a remote oracle spends
+    most of its time waiting, which threads overlap.
+    """
+    if not ciphertext or len(ciphertext) % BLOCK_SIZE:
+        raise ValueError("Ciphertext length must be a multiple of the block size.")
+
+    blocks = [bytes(block) for block in iter_blocks(iv + ciphertext, BLOCK_SIZE)]
+    final = len(blocks) - 1
+
+    def recover(index: int) -> bytes:
+        block_order = (
+            FINAL_BLOCK_ORDER if index == final and order is CANDIDATE_ORDER else order
+        )
+        return recover_block(
+            blocks[index - 1], blocks[index], oracle, batch_size, block_order
+        )
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        plaintext = b"".join(executor.map(recover, range(1, len(blocks))))
+
+    return pkcs7_unpad(plaintext)
@@ -0,0 +1,76 @@
+# """Core cryptographic primitives shared by the challenges
+# Everything here can be imported without reading files, drawing random bytes, plotting or
+# loading images. NumPy is used to speed up the larger operations when it is installed, and
+# is only imported the first time one of them runs. PyCryptodome is only imported the first
+# time an AES cipher is built.
+# """
+
+from challenges.core.acceleration import get_numpy
+from challenges.core.aes import (
+    aes_cbc_decrypt,
+    aes_cbc_decrypt_into,
+    aes_ecb_decrypt,
+    aes_ecb_encrypt,
+    get_ecb_cipher,
+)
+from challenges.core.batch import (
+    as_byte_array,
+    crack_single_byte_xor_many,
+    score_histograms,
+)
+from challenges.core.blocks import BLOCK_SIZE, bytes_to_chunks, iter_blocks
+from challenges.core.oracles import (
+    EncryptionOracleType,
+    InstrumentedOracle,
+    MemoizingOracle,
+    OracleCache,
+    OracleStats,
+    QueryTrace,
+    query_blocks,
+)
+from challenges.core.padding import PaddingError, pkcs7_pad, pkcs7_unpad
+from challenges.core.xor import (
+    ENGLISH_FREQUENCIES,
+    BytesLike,
+    ScoredGuess,
+    byte_histogram,
+    bytes_xor,
+    crack_single_byte_xor,
+    hamming_distance,
+    repeating_key_xor,
+    score_histogram,
+)
+
+__all__ = [
+    "BLOCK_SIZE",
+    "ENGLISH_FREQUENCIES",
+    "BytesLike",
+    "EncryptionOracleType",
+    "InstrumentedOracle",
+    "MemoizingOracle",
+    "OracleCache",
+    "OracleStats",
+    "PaddingError",
+    "QueryTrace",
+    "ScoredGuess",
+    "aes_cbc_decrypt",
+    "aes_cbc_decrypt_into",
+    "aes_ecb_decrypt",
+    "aes_ecb_encrypt",
+    "as_byte_array",
+    "byte_histogram",
+    "bytes_to_chunks",
+    "bytes_xor",
+    "crack_single_byte_xor",
+    "crack_single_byte_xor_many",
+    "get_ecb_cipher",
+    "get_numpy",
+    "hamming_distance",
+    "iter_blocks",
+    "pkcs7_pad",
+    "pkcs7_unpad",
+    "query_blocks",
+    "repeating_key_xor",
+    "score_histograms",
+    "score_histogram",
+]
@@ -0,0 +1,30 @@
+# """Optional NumPy acceleration
+# NumPy is looked up the first time an accelerated operation asks for it, so importing the
+# core never imports NumPy, and the pure-Python paths are used when it is not installed.
+# Set CRYPTO_CORE_NO_NUMPY=1 to force the pure-Python paths.
+# """
+
+import os
+
+from functools import lru_cache
+
+ACCELERATION_THRESHOLD = 4096  # Shorter inputs are faster without NumPy
+
+
+@lru_cache(maxsize=None)
+def get_numpy():
+    """Return the numpy module, or None when it is unavailable or disabled."""
+    if os.environ.get("CRYPTO_CORE_NO_NUMPY"):
+        return None
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def accelerated(length: int):
+    """Return the numpy module if it is worth using for `length` bytes, else None."""
+    if length < ACCELERATION_THRESHOLD:
+        return None
+    return get_numpy()
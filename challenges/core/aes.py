@@ -0,0 +1,91 @@
+# """AES in ECB and CBC mode
+# PyCryptodome is only imported when the first cipher is built.
+# """
+
+from functools import lru_cache
+from typing import Optional, Union
+
+from challenges.core.blocks import BLOCK_SIZE
+from challenges.core.padding import pkcs7_unpad
+from challenges.core.xor import BytesLike, bytes_xor
+
+CIPHER_CACHE_SIZE = 256  # Most ECB key schedules kept alive at once
+
+
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def get_ecb_cipher(key: bytes):
+    """Return an AES-ECB cipher for the key, running its key schedule only once.
+
+    ECB cipher objects carry no chaining state, so one can be shared by every
+    caller using the same key. get_ecb_cipher.cache_info() reports the hits
+    and misses. Only use it for keys that are used again; a cipher for a
+    one-off random key belongs in AES.new, where it cannot evict them.
+    """
+    from Crypto.Cipher import AES
+
+    return AES.new(key, AES.MODE_ECB)
+
+
+def aes_ecb_decrypt(
+    ciphertext: bytes, key: bytes, out: Optional[Union[bytearray, memoryview]] = None
+) -> Union[bytes, bytearray, memoryview]:
+    """Decrypt ciphertext using AES in ECB mode with the given key.
+
+    When `out` is given the plaintext is written into it and `out` is
+    returned instead of a new bytes object.
+    """
+    cipher = get_ecb_cipher(bytes(key))
+    if out is None:
+        return cipher.decrypt(ciphertext)
+
+    cipher.decrypt(ciphertext, output=out)
+    return out
+
+
+def aes_ecb_encrypt(
+    plaintext: bytes, key: bytes, out: Optional[Union[bytearray, memoryview]] = None
+) -> Union[bytes, bytearray, memoryview]:
+    """Encrypt plaintext using AES in ECB mode with the given key.
+
+    When `out` is given the ciphertext is written into it and `out` is
+    returned instead of a new bytes object.
+    """
+    cipher = get_ecb_cipher(bytes(key))
+    if out is None:
+        return cipher.encrypt(plaintext)
+
+    cipher.encrypt(plaintext, output=out)
+    return out
+
+
+def aes_cbc_decrypt(
+    ciphertext: bytes, key: bytes, iv: bytes, use_pkcs7: bool = True
+) -> bytes:
+    """Decrypts ciphertext using AES in CBC mode."""
+    if len(ciphertext) % BLOCK_SIZE:
+        raise ValueError("Ciphertext length must be a multiple of the block size.")
+
+    decrypted = memoryview(bytearray(len(ciphertext)))
+    aes_cbc_decrypt_into(ciphertext, key, iv, decrypted)
+
+    plaintext: bytes = decrypted.tobytes()
+    if use_pkcs7:
+        plaintext = pkcs7_unpad(plaintext)
+    return plaintext
+
+
+def aes_cbc_decrypt_into(
+    ciphertext: BytesLike, key: bytes, iv: BytesLike, out: memoryview
+) -> memoryview:
+    """Decrypts block-aligned ciphertext in CBC mode into `out`, without padding.
+
+    The whole buffer is ECB-decrypted in one cipher call, then XORed in place
+    against the ciphertext shifted one block to the right, with the IV in
+    front, since block i of plaintext is D(C[i]) ^ C[i - 1].
+    """
+    ciphertext = memoryview(ciphertext)
+    aes_ecb_decrypt(ciphertext, key, out=out)
+
+    bytes_xor(out[:BLOCK_SIZE], iv, out=out[:BLOCK_SIZE])
+    bytes_xor(out[BLOCK_SIZE:], ciphertext[:-BLOCK_SIZE], out=out[BLOCK_SIZE:])
+    return out
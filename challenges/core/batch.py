@@ -0,0 +1,170 @@
+# """Batched single-byte XOR scoring
+# NumPy versions of the scorer in challenges.core.xor that score many ciphertexts, or every
+# column of a transposed ciphertext, in one pass. NumPy is looked up through get_numpy() when
+# one of them runs; crack_single_byte_xor_many falls back to scoring one ciphertext at a time
+# without it, and the others raise ImportError.
+# """
+
+import heapq
+
+from functools import lru_cache
+
+from challenges.core.acceleration import get_numpy
+from challenges.core.xor import (
+    ENGLISH_FREQUENCIES,
+    BytesLike,
+    ScoredGuess,
+    byte_histogram,
+    repeating_key_xor,
+    score_histogram,
+)
+
+SCORE_ROWS_PER_PASS = 4096  # Ciphertexts scored at once, bounds the score buffers
+
+
+def require_numpy():
+    """Return the numpy module, or raise ImportError when it is unavailable."""
+    np = get_numpy()
+    if np is None:
+        raise ImportError("NumPy is required for batched scoring.")
+    return np
+
+
+def as_byte_array(buffer: BytesLike):
+    """View a bytes-like object as a flat uint8 array without copying."""
+    np = require_numpy()
+    return np.frombuffer(buffer, dtype=np.uint8)
+
+
+# get_xor_table()[k, b] == k ^ b, so hist[get_xor_table()[k]] is the histogram
+# of the ciphertext decrypted with key k
+@lru_cache(maxsize=None)
+def get_xor_table():
+    """The 256 x 256 table of byte XORs, built on first use."""
+    np = require_numpy()
+    return np.bitwise_xor.outer(np.arange(256), np.arange(256))
+
+
+def score_histograms(
+    histograms, lengths, frequencies: dict[str, float] = ENGLISH_FREQUENCIES
+):
+    """Score every single-byte key against each row of byte histograms.
+
+    `histograms` has shape (n, 256) and `lengths` shape (n,). The result has
+    shape (n, 256) where entry [i, k] is score_histogram() of row i at key k.
+    """
+    np = require_numpy()
+    xor_table = get_xor_table()
+    scores = np.zeros(histograms.shape)
+    term = np.empty(histograms.shape)
+    lengths = lengths[:, None]
+
+    # Decrypting with key k maps plaintext byte b to ciphertext byte b ^ k, so
+    # column k of histograms[:, xor_table[:, b]] counts b after decryption.
+    # One letter at a time keeps every temporary at (n, 256).
+    for letter, expected in frequencies.items():
+        np.divide(histograms[:, xor_table[:, ord(letter)]], lengths, out=term)
+        np.subtract(expected, term, out=term)
+        scores += np.abs(term, out=term)
+    return scores
+
+
+def pack_ciphertexts(ciphertexts: list[BytesLike]) -> tuple:
+    """Pack ciphertexts into a zero-padded (n, max_length) uint8 array.
+
+    Returns the packed array together with the length of each row.
+    """
+    np = require_numpy()
+    lengths = np.array([len(ciphertext) for ciphertext in ciphertexts])
+    packed = np.zeros((len(ciphertexts), lengths.max(initial=0)), dtype=np.uint8)
+    for row, ciphertext in enumerate(ciphertexts):
+        packed[row, : lengths[row]] = as_byte_array(ciphertext)
+    return packed, lengths
+
+
+def histogram_rows(packed, lengths):
+    """Byte histogram of every row of a packed array, ignoring the padding."""
+    np = require_numpy()
+    rows = len(packed)
+    in_row = np.arange(packed.shape[1]) < lengths[:, None]
+
+    # Offset each row into its own 256-bin range so one bincount covers all
+    bins = packed.astype(np.int64) + 256 * np.arange(rows)[:, None]
+    return np.bincount(bins[in_row], minlength=256 * rows).reshape(rows, 256)
+
+
+def crack_single_byte_xor_many(
+    ciphertexts: list[BytesLike],
+    top_k: int = 1,
+    frequencies: dict[str, float] = ENGLISH_FREQUENCIES,
+) -> list[ScoredGuess]:
+    """Crack many single-byte XOR ciphertexts in one vectorised pass.
+
+    All N x 256 (ciphertext, key) pairs are scored, SCORE_ROWS_PER_PASS
+    ciphertexts at a time, and the `top_k` best guesses across the whole
+    batch are returned, best first. Ties go to the earlier ciphertext and
+    then the smaller key.
+    """
+    if any(not len(ciphertext) for ciphertext in ciphertexts):
+        raise ValueError("Ciphertexts must not be empty.")
+    if not ciphertexts or top_k < 1:
+        return []
+
+    best = best_pairs(ciphertexts, top_k, frequencies)
+    guesses = []
+    for score, index in best:
+        row, key = divmod(index, 256)
+        ciphertext = ciphertexts[row]
+        plaintext = repeating_key_xor(bytes([key]), ciphertext)
+        guesses.append(
+            ScoredGuess(
+                score=score,
+                key=key,
+                ciphertext=bytes(ciphertext),
+                plaintext=plaintext,
+            )
+        )
+    return guesses
+
+
+def best_pairs(
+    ciphertexts: list[BytesLike],
+    top_k: int,
+    frequencies: dict[str, float],
+) -> list[tuple[float, int]]:
+    """The `top_k` lowest (score, row * 256 + key) pairs, best first."""
+    np = get_numpy()
+    if np is None:
+        pairs = (
+            (score, row * 256 + key)
+            for row, ciphertext in enumerate(ciphertexts)
+            for key, score in enumerate(
+                score_histogram(
+                    byte_histogram(ciphertext), len(ciphertext), frequencies
+                )
+            )
+        )
+        return heapq.nsmallest(top_k, pairs)
+
+    # Score SCORE_ROWS_PER_PASS ciphertexts at a time and keep only the best
+    # k pairs of each pass, so memory does not grow with the batch
+    best_scores, best_indices = [], []
+    for start in range(0, len(ciphertexts), SCORE_ROWS_PER_PASS):
+        packed, lengths = pack_ciphertexts(
+            ciphertexts[start : start + SCORE_ROWS_PER_PASS]
+        )
+        histograms = histogram_rows(packed, lengths)
+        scores = score_histograms(histograms, lengths, frequencies).ravel()
+
+        # Select the best k pairs without sorting every score
+        k = min(top_k, scores.size)
+        best = np.argpartition(scores, k - 1)[:k]
+        best_scores.append(scores[best])
+        best_indices.append(best + start * 256)
+
+    scores, indices = np.concatenate(best_scores), np.concatenate(best_indices)
+    order = np.lexsort((indices, scores))[:top_k]
+    return [
+        (float(score), int(index))
+        for score, index in zip(scores[order], indices[order])
+    ]
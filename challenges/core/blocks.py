@@ -0,0 +1,22 @@
+# """Splitting buffers into blocks"""
+
+from typing import Iterator
+
+from challenges.core.xor import BytesLike
+
+BLOCK_SIZE = 16  # AES block size is 16 bytes
+
+
+def iter_blocks(b: BytesLike, block_size: int) -> Iterator[memoryview]:
+    """Lazily yield each block of `b` as a memoryview slice, without copying.
+
+    The final block is shorter when len(b) is not a multiple of block_size.
+    """
+    view = memoryview(b)
+    for i in range(0, len(view), block_size):
+        yield view[i : i + block_size]
+
+
+def bytes_to_chunks(b: BytesLike, chunk_size: int) -> list[bytes]:
+    """Split bytes into a list of chunks of a specified size."""
+    return [bytes(block) for block in iter_blocks(b, chunk_size)]
@@ -0,0 +1,235 @@
+# """Encryption oracle instrumentation and caching
+# Wrappers shared by the attacks that query an encryption oracle: InstrumentedOracle measures
+# every query into an OracleStats, and MemoizingOracle answers repeated queries from an
+# OracleCache.
+# """
+
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Callable, Optional
+
+from challenges.core.blocks import BLOCK_SIZE
+
+EncryptionOracleType = Callable[
+    [bytes], bytes
+]  # Take one bytes argument and return bytes
+
+# Upper bounds of the latency histogram buckets, in seconds; the last bucket
+# counts everything slower
+LATENCY_BUCKETS = (1e-6, 1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 1.0)
+ORACLE_CACHE_MAX_BYTES = 1 << 26  # Memory cap of an OracleCache
+ORACLE_CACHE_PREFIX_BLOCKS = 4  # Leading blocks of each query indexed for reuse
+
+
+@dataclass
+class OracleStats:
+    """Data class to hold how much work an encryption oracle has done."""
+
+    queries: int = 0  # Number of oracle calls
+    bytes_in: int = 0  # Total length of the plaintexts sent
+    bytes_out: int = 0  # Total length of the ciphertexts returned
+    seconds: float = 0.0  # Total time spent inside the oracle
+    latency_histogram: list[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+
+    def record(self, plaintext_length: int, ciphertext_length: int, seconds: float):
+        """Account for one oracle query."""
+        self.queries += 1
+        self.bytes_in += plaintext_length
+        self.bytes_out += ciphertext_length
+        self.seconds += seconds
+        self.latency_histogram[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+
+    def merge(self, other: "OracleStats"):
+        """Add the totals of another OracleStats, e.g. from a worker process."""
+        self.queries += other.queries
+        self.bytes_in += other.bytes_in
+        self.bytes_out += other.bytes_out
+        self.seconds += other.seconds
+        self.latency_histogram = [
+            mine + theirs
+            for mine, theirs in zip(self.latency_histogram, other.latency_histogram)
+        ]
+
+    def summary(self) -> str:
+        """One-line description of the totals."""
+        return (
+            f"{self.queries} queries, {self.bytes_in} bytes in, "
+            f"{self.bytes_out} bytes out, {self.seconds * 1e3:.1f} ms"
+        )
+
+    def histogram(self) -> str:
+        """One-line description of the latency histogram."""
+        labels = [f"<{bound * 1e6:g}µs" for bound in LATENCY_BUCKETS] + ["slower"]
+        return ", ".join(
+            f"{label}: {count}"
+            for label, count in zip(labels, self.latency_histogram)
+            if count
+        )
+
+
+@dataclass
+class QueryTrace:
+    """Data class to hold one traced oracle query."""
+
+    plaintext: bytes  # What was sent to the oracle
+    ciphertext_length: int  # How much came back
+    seconds: float  # How long the query took
+
+
+class InstrumentedOracle:
+    """Encryption oracle wrapper that measures every query.
+
+    It is itself an EncryptionOracleType, so wrappers can be stacked, for
+    example one per attack phase around one for the whole challenge. Pass
+    an existing OracleStats to aggregate several oracles into one set of
+    totals, and trace=True to keep a QueryTrace for every query.
+    """
+
+    def __init__(
+        self,
+        oracle: EncryptionOracleType,
+        stats: Optional[OracleStats] = None,
+        trace: bool = False,
+    ):
+        self.oracle = oracle
+        self.stats = stats if stats is not None else OracleStats()
+        self.trace: Optional[list[QueryTrace]] = [] if trace else None
+
+    def __call__(self, plaintext: bytes) -> bytes:
+        start = perf_counter()
+        ciphertext = self.oracle(plaintext)
+        seconds = perf_counter() - start
+
+        self.stats.record(len(plaintext), len(ciphertext), seconds)
+        if self.trace is not None:
+            self.trace.append(QueryTrace(bytes(plaintext), len(ciphertext), seconds))
+        return ciphertext
+
+
+class OracleCache:
+    """LRU store of oracle answers, bounded by the bytes it holds.
+
+    Besides exact queries it indexes the first few whole blocks of every
+    stored query, so a later query that starts with the same blocks can have
+    the matching leading ciphertext blocks answered from the store.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = ORACLE_CACHE_MAX_BYTES,
+        block_size: int = BLOCK_SIZE,
+        prefix_blocks: int = ORACLE_CACHE_PREFIX_BLOCKS,
+    ):
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.prefix_blocks = prefix_blocks
+        self.size = 0  # Bytes held, counting queries, answers and prefix keys
+        self.hits = self.prefix_hits = self.misses = 0
+        self._entries: OrderedDict[bytes, bytes] = OrderedDict()
+        self._prefixes: dict[bytes, bytes] = {}  # Leading blocks -> full query
+
+    def get(self, plaintext: bytes) -> Optional[bytes]:
+        """Answer for an exact query, if stored."""
+        ciphertext = self._entries.get(plaintext)
+        if ciphertext is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(plaintext)
+        return ciphertext
+
+    def get_prefix(self, plaintext: bytes, num_blocks: int) -> Optional[bytes]:
+        """Leading `num_blocks` answer blocks for a query, if derivable."""
+        length = num_blocks * self.block_size
+        if num_blocks > self.prefix_blocks or len(plaintext) < length:
+            return None
+
+        source = self._prefixes.get(plaintext[:length])
+        if source is None:
+            return None
+        self.prefix_hits += 1
+        self._entries.move_to_end(source)
+        return self._entries[source][:length]
+
+    def put(self, plaintext: bytes, ciphertext: bytes):
+        """Store an answer, evicting the least recently used ones over the cap."""
+        if plaintext in self._entries:
+            return
+        self._entries[plaintext] = ciphertext
+        self.size += len(plaintext) + len(ciphertext)
+        for key in self._prefix_keys(plaintext):
+            if key not in self._prefixes:
+                self._prefixes[key] = plaintext
+                self.size += len(key)
+
+        while self.size > self.max_bytes and self._entries:
+            old_plaintext, old_ciphertext = self._entries.popitem(last=False)
+            self.size -= len(old_plaintext) + len(old_ciphertext)
+            for key in self._prefix_keys(old_plaintext):
+                if self._prefixes.get(key) == old_plaintext:
+                    del self._prefixes[key]
+                    self.size -= len(key)
+
+    def summary(self) -> str:
+        """One-line description of the cache counters."""
+        return (
+            f"{self.hits} hits, {self.prefix_hits} prefix hits, "
+            f"{self.misses} misses, {len(self._entries)} entries, {self.size} bytes"
+        )
+
+    def _prefix_keys(self, plaintext: bytes) -> list[bytes]:
+        whole_blocks = min(len(plaintext) // self.block_size, self.prefix_blocks)
+        return [
+            plaintext[: blocks * self.block_size]
+            for blocks in range(1, whole_blocks + 1)
+        ]
+
+
+class MemoizingOracle:
+    """Opt-in caching wrapper for deterministic encryption oracles.
+
+    Repeated queries are answered from an OracleCache instead of reaching
+    the wrapped oracle; several wrappers may share one cache. prefix() can
+    additionally answer from earlier queries that start with the same
+    blocks, which is only sound when each answer block depends on the query
+    blocks before it alone, as with ECB and no unknown prefix.
+    """
+
+    def __init__(
+        self, oracle: EncryptionOracleType, cache: Optional[OracleCache] = None
+    ):
+        self.oracle = oracle
+        self.cache = cache if cache is not None else OracleCache()
+
+    def __call__(self, plaintext: bytes) -> bytes:
+        plaintext = bytes(plaintext)
+        ciphertext = self.cache.get(plaintext)
+        if ciphertext is None:
+            ciphertext = self.oracle(plaintext)
+            self.cache.put(plaintext, ciphertext)
+        return ciphertext
+
+    def prefix(self, plaintext: bytes, num_blocks: int) -> bytes:
+        """The first `num_blocks` blocks of the answer to a query."""
+        plaintext = bytes(plaintext)
+        ciphertext = self.cache.get_prefix(plaintext, num_blocks)
+        if ciphertext is None:
+            ciphertext = self(plaintext)[: num_blocks * self.cache.block_size]
+        return ciphertext
+
+
+def query_blocks(
+    oracle: EncryptionOracleType, plaintext: bytes, num_blocks: int
+) -> bytes:
+    """The first `num_blocks` blocks of an oracle's answer.
+
+    Goes through MemoizingOracle.prefix() when the oracle has it, so leading
+    blocks already seen can be answered without a query.
+    """
+    if isinstance(oracle, MemoizingOracle):
+        return oracle.prefix(plaintext, num_blocks)
+    return oracle(plaintext)[: num_blocks * BLOCK_SIZE]
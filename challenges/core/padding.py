@@ -0,0 +1,30 @@
+# """PKCS#7 padding"""
+
+
+class PaddingError(Exception):
+    """Custom exception for padding errors."""
+
+    pass
+
+
+def pkcs7_pad(data: bytes, block_size: int) -> bytes:
+    """Apply PKCS#7 padding to the input data."""
+    if block_size == 16:
+        padding_length = block_size - (len(data) & 15)
+    else:
+        padding_length = block_size - (len(data) % block_size)
+    padding = bytes([padding_length]) * padding_length
+    return data + padding
+
+
+def pkcs7_unpad(data: bytes) -> bytes:
+    """Remove PKCS#7 padding from the input data."""
+
+    padding_length = data[-1]
+    if (
+        padding_length == 0
+        or len(data) < padding_length
+        or data.endswith(bytes([padding_length]) * padding_length) is False
+    ):
+        raise PaddingError
+    return data[:-padding_length]
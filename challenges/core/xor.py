@@ -0,0 +1,166 @@
+# """XOR primitives and single-byte XOR cracking
+# The pure-Python paths XOR whole buffers as big integers, which keeps them in C without
+# NumPy. Inputs of ACCELERATION_THRESHOLD bytes or more use NumPy when it is available.
+# """
+
+from dataclasses import dataclass
+from typing import Optional, Union
+
+from challenges.core.acceleration import accelerated
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+# Letter frequencies of challenges/assets/frankenstein.txt, as compiled by
+# challenge_03.compile_frequency_model, so that scoring needs no corpus
+ENGLISH_FREQUENCIES = {
+    "a": 0.07749,
+    "b": 0.01404,
+    "c": 0.02666,
+    "d": 0.04923,
+    "e": 0.13463,
+    "f": 0.02508,
+    "g": 0.01697,
+    "h": 0.05713,
+    "i": 0.06305,
+    "j": 0.00127,
+    "k": 0.00507,
+    "l": 0.03711,
+    "m": 0.03032,
+    "n": 0.07132,
+    "o": 0.07377,
+    "p": 0.01749,
+    "q": 0.00095,
+    "r": 0.06098,
+    "s": 0.06127,
+    "t": 0.08747,
+    "u": 0.03045,
+    "v": 0.01116,
+    "w": 0.02160,
+    "x": 0.00199,
+    "y": 0.02280,
+    "z": 0.00072,
+}
+
+
+@dataclass(order=True)
+class ScoredGuess:
+    """Data class to hold a scored guess for the single-byte XOR cipher."""
+
+    score: float = float("inf")  # Initialize with a high score
+    key: Optional[bytes] = None  # The cipher key used for XOR
+    ciphertext: Optional[bytes] = None  # The ciphertext being decoded
+    plaintext: Optional[bytes] = None  # The resulting plaintext after decoding
+
+
+def bytes_xor(
+    a: BytesLike, b: BytesLike, out: Optional[Union[bytearray, memoryview]] = None
+) -> Union[bytes, bytearray, memoryview]:
+    """Perform XOR operation on two byte sequences.
+
+    When `out` is given the result is written into it (which may alias `a`
+    or `b`) and `out` is returned instead of a new bytes object.
+    """
+    if len(a) != len(b):
+        raise ValueError("Byte sequences must be of equal length.")
+
+    np = accelerated(len(a))
+    if np is not None:
+        a_array = np.frombuffer(a, dtype=np.uint8)
+        b_array = np.frombuffer(b, dtype=np.uint8)
+        if out is None:
+            return np.bitwise_xor(a_array, b_array).tobytes()
+        np.bitwise_xor(a_array, b_array, out=np.frombuffer(out, dtype=np.uint8))
+        return out
+
+    result = (int.from_bytes(a, "little") ^ int.from_bytes(b, "little")).to_bytes(
+        len(a), "little"
+    )
+    if out is None:
+        return result
+    out[:] = result
+    return out
+
+
+def repeating_key_xor(
+    key: BytesLike,
+    plaintext: BytesLike,
+    out: Optional[Union[bytearray, memoryview]] = None,
+) -> Union[bytes, bytearray, memoryview]:
+    """Encrypt plaintext using repeating-key XOR with the given key.
+
+    When `out` is given the result is written into it and `out` is returned.
+    """
+    if not len(key):
+        raise ValueError("Key must not be empty.")
+    if out is not None and len(out) != len(plaintext):
+        raise ValueError("Output buffer must match the plaintext length.")
+
+    np = accelerated(len(plaintext))
+    if np is not None:
+        # The key is broadcast across rows of len(key) bytes rather than
+        # repeated to full length; the remainder is XORed separately
+        key_array = np.frombuffer(key, dtype=np.uint8)
+        data = np.frombuffer(plaintext, dtype=np.uint8)
+        result = np.empty_like(data) if out is None else np.frombuffer(out, np.uint8)
+        full = data.size - data.size % key_array.size
+        np.bitwise_xor(
+            data[:full].reshape(-1, key_array.size),
+            key_array,
+            out=result[:full].reshape(-1, key_array.size),
+        )
+        np.bitwise_xor(data[full:], key_array[: data.size - full], out=result[full:])
+        return result.tobytes() if out is None else out
+
+    repeats = len(plaintext) // len(key) + 1
+    return bytes_xor(plaintext, (bytes(key) * repeats)[: len(plaintext)], out=out)
+
+
+def hamming_distance(s1: BytesLike, s2: BytesLike) -> int:
+    """Calculate the Hamming distance between two byte strings."""
+    if len(s1) != len(s2):
+        raise ValueError("Strings must be of equal length")
+
+    return (int.from_bytes(s1, "little") ^ int.from_bytes(s2, "little")).bit_count()
+
+
+def byte_histogram(data: BytesLike) -> list[int]:
+    """Count how often each of the 256 byte values occurs in `data`."""
+    np = accelerated(len(data))
+    if np is not None:
+        return np.bincount(np.frombuffer(data, np.uint8), minlength=256).tolist()
+
+    data = bytes(data)
+    return [data.count(b) for b in range(256)]
+
+
+def score_histogram(
+    histogram: list[int],
+    length: int,
+    frequencies: dict[str, float] = ENGLISH_FREQUENCIES,
+) -> list[float]:
+    """Score every single-byte key against the byte histogram of a ciphertext.
+
+    Entry k is the sum over the letters of |expected - actual| frequency
+    after decrypting with key k; lower is more English-like.
+    """
+    letters = [(ord(letter), expected) for letter, expected in frequencies.items()]
+    return [
+        sum(abs(expected - histogram[b ^ key] / length) for b, expected in letters)
+        for key in range(256)
+    ]
+
+
+def crack_single_byte_xor(
+    ciphertext: BytesLike, frequencies: dict[str, float] = ENGLISH_FREQUENCIES
+) -> ScoredGuess:
+    """Crack a single-byte XOR cipher."""
+    if not len(ciphertext):
+        raise ValueError("Ciphertext must not be empty.")
+
+    # One pass over the data, then every key is scored from the histogram
+    scores = score_histogram(byte_histogram(ciphertext), len(ciphertext), frequencies)
+    key = min(range(256), key=scores.__getitem__)
+    plaintext = repeating_key_xor(bytes([key]), ciphertext)
+    return ScoredGuess(
+        score=scores[key], key=key, ciphertext=bytes(ciphertext), plaintext=plaintext
+    )
@@ -0,0 +1,321 @@
+# """Local oracle server and pipelined async attack client
+# The challenge 11 and 12 encryption oracles are hosted behind a length-prefixed TCP protocol
+# on localhost, so the attacks can be run against them the way they would be against a real
+# service. The client keeps a pool of connections, pipelines requests on each of them and
+# issues independent queries concurrently.
+#
+# Frames in both directions are a 4-byte big-endian length followed by the payload. A request
+# payload is one oracle id byte followed by the plaintext. A response payload is one status
+# byte followed by the answer. On success the byte-at-a-time oracle answers with the
+# ciphertext, and the detection oracle with the mode byte it picked (for scoring) followed by
+# the ciphertext; on error the answer is the UTF-8 error message.
+# """
+
+import argparse
+import asyncio
+import struct
+
+from itertools import cycle
+from time import perf_counter
+from typing import Optional
+
+from challenges.challenge_11 import (
+    AESMode,
+    detector,
+    detector_probe,
+    get_encryption_oracle,
+)
+from challenges.challenge_12 import BLOCK_SIZE, make_encryption_oracle
+
+HOST = "127.0.0.1"
+PORT = 9999
+BYTE_AT_A_TIME_ORACLE = 1  # challenge_12.make_encryption_oracle, one per server
+DETECTION_ORACLE = 2  # challenge_11.get_encryption_oracle, a new one per request
+MODE_BYTES = {AESMode.ECB: b"E", AESMode.CBC: b"C"}
+FRAME_HEADER = struct.Struct(">I")
+MAX_PROBE_LENGTH = 64  # Longest input probed when looking for the block size
+MAX_PIPELINED_REQUESTS = 256  # Requests the server handles at once per connection
+STATUS_OK = 0
+STATUS_ERROR = 1  # The oracle raised; the rest of the frame is the message
+
+
+class OracleError(Exception):
+    """Raised by the client when the server could not answer a request."""
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """Read one length-prefixed frame, or None at end of stream."""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        return await reader.readexactly(FRAME_HEADER.unpack(header)[0])
+    except (asyncio.IncompleteReadError, ConnectionResetError):
+        return None
+
+
+def write_frame(writer: asyncio.StreamWriter, payload: bytes):
+    """Queue one length-prefixed frame for sending."""
+    writer.write(FRAME_HEADER.pack(len(payload)) + payload)
+
+
+class OracleServer:
+    """Serves the challenge oracles over the length-prefixed protocol.
+
+    Requests on a connection are handled concurrently, which matters when
+    `latency` simulates a slow remote service, and answered in the order
+    they arrived so that clients can pipeline them. At most
+    MAX_PIPELINED_REQUESTS are in flight per connection; beyond that the
+    server stops reading until responses have gone out.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.byte_at_a_time_oracle = make_encryption_oracle()
+        self.requests = 0
+
+    def answer(self, request: bytes) -> bytes:
+        """Run one request against the oracle it names."""
+        oracle_id, plaintext = request[0], request[1:]
+        if oracle_id == BYTE_AT_A_TIME_ORACLE:
+            return self.byte_at_a_time_oracle(plaintext)
+        if oracle_id == DETECTION_ORACLE:
+            mode, oracle = get_encryption_oracle()
+            return MODE_BYTES[mode] + oracle(plaintext)
+        raise ValueError(f"Unknown oracle id {oracle_id}")
+
+    async def handle_request(self, request: bytes) -> bytes:
+        """Answer one request as a response payload, including its status."""
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        self.requests += 1
+        try:
+            return bytes([STATUS_OK]) + self.answer(request)
+        except Exception as e:
+            # Report the failure to this request only, so that the responses
+            # pipelined behind it still go out in order
+            return bytes([STATUS_ERROR]) + f"{type(e).__name__}: {e}".encode()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        pending: asyncio.Queue = asyncio.Queue(maxsize=MAX_PIPELINED_REQUESTS)
+
+        async def send_responses():
+            while (task := await pending.get()) is not None:
+                write_frame(writer, await task)
+                try:
+                    await writer.drain()
+                except ConnectionError:
+                    return  # The client is gone; the reader sees it as well
+
+        sender = asyncio.create_task(send_responses())
+        while (request := await read_frame(reader)) is not None:
+            await pending.put(asyncio.create_task(self.handle_request(request)))
+        await pending.put(None)
+        await sender
+        writer.close()
+
+    async def start(self, host: str = HOST, port: int = PORT) -> asyncio.Server:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+
+class PipelinedConnection:
+    """One client connection with any number of requests in flight."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader, self.writer = reader, writer
+        self.waiting: asyncio.Queue = asyncio.Queue()  # Futures in request order
+        self.receiver = asyncio.create_task(self.receive_responses())
+
+    async def receive_responses(self):
+        while (response := await read_frame(self.reader)) is not None:
+            # A response still takes its place in the queue when the request
+            # waiting for it was cancelled, but has nowhere to go
+            if (future := self.waiting.get_nowait()).done():
+                continue
+            if response[0] == STATUS_OK:
+                future.set_result(response[1:])
+            else:
+                future.set_exception(OracleError(response[1:].decode()))
+        while not self.waiting.empty():
+            if not (future := self.waiting.get_nowait()).done():
+                future.set_exception(
+                    ConnectionError("Oracle server closed the connection")
+                )
+
+    async def request(self, payload: bytes) -> bytes:
+        if self.receiver.done():
+            raise ConnectionError("Oracle server closed the connection")
+        future = asyncio.get_running_loop().create_future()
+        self.waiting.put_nowait(future)
+        write_frame(self.writer, payload)
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.receiver
+
+
+class AsyncOracleClient:
+    """Pooled, pipelining client for an OracleServer.
+
+    Requests are spread over `pool_size` connections, and at most
+    `max_in_flight` of them are outstanding at once.
+    """
+
+    def __init__(
+        self,
+        host: str = HOST,
+        port: int = PORT,
+        pool_size: int = 4,
+        max_in_flight: int = 256,
+    ):
+        self.host, self.port, self.pool_size = host, port, pool_size
+        self.limit = asyncio.Semaphore(max_in_flight)
+        self.connections: list[PipelinedConnection] = []
+        self.queries = 0
+
+    async def __aenter__(self) -> "AsyncOracleClient":
+        try:
+            for _ in range(self.pool_size):
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+                self.connections.append(PipelinedConnection(reader, writer))
+        except BaseException:
+            await self.close()  # Do not leak the connections already opened
+            raise
+        self._next_connection = cycle(self.connections)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close every connection in the pool."""
+        await asyncio.gather(*(connection.close() for connection in self.connections))
+        self.connections.clear()
+
+    async def query(self, oracle_id: int, plaintext: bytes) -> bytes:
+        async with self.limit:
+            self.queries += 1
+            connection = next(self._next_connection)
+            return await connection.request(bytes([oracle_id]) + plaintext)
+
+
+async def find_block_size_and_postfix_length(
+    client: AsyncOracleClient,
+) -> tuple[int, int]:
+    """Async challenge_12.find_block_size_and_postfix_length with all probes at once."""
+    lengths = await asyncio.gather(
+        *(
+            client.query(BYTE_AT_A_TIME_ORACLE, bytes(i))
+            for i in range(1, MAX_PROBE_LENGTH + 1)
+        )
+    )
+    lengths = [len(ciphertext) for ciphertext in lengths]
+
+    for i, length in enumerate(lengths[1:], start=2):
+        if length > lengths[0]:
+            return length - lengths[0], lengths[0] - i
+    raise ValueError("Block size not found")
+
+
+async def guess_byte(client: AsyncOracleClient, prefix: bytes, target: bytes) -> int:
+    """Async challenge_12.guess_byte with all 256 candidates at once."""
+    ciphertexts = await asyncio.gather(
+        *(client.query(BYTE_AT_A_TIME_ORACLE, prefix + bytes([b])) for b in range(256))
+    )
+    for b, ciphertext in enumerate(ciphertexts):
+        if ciphertext[:BLOCK_SIZE] == target:
+            return b
+    raise ValueError("No matching byte found")
+
+
+async def byte_at_a_time(client: AsyncOracleClient) -> bytes:
+    """Run the challenge 12 attack against the server."""
+    _, postfix_length = await find_block_size_and_postfix_length(client)
+
+    ciphertexts = await asyncio.gather(
+        *(client.query(BYTE_AT_A_TIME_ORACLE, bytes(15 - i)) for i in range(BLOCK_SIZE))
+    )
+    postfix = bytearray(15)
+    for i in range(postfix_length):
+        block_start = (i // BLOCK_SIZE) * BLOCK_SIZE
+        target = ciphertexts[i % BLOCK_SIZE][block_start : block_start + BLOCK_SIZE]
+        postfix.append(await guess_byte(client, bytes(postfix[-15:]), target))
+    return bytes(postfix[15:])
+
+
+async def detection_trials(client: AsyncOracleClient, num_trials: int) -> int:
+    """Run challenge_11.detector against the server; returns correct guesses."""
+    mode_of = {mode_byte: mode for mode, mode_byte in MODE_BYTES.items()}
+
+    async def trial() -> bool:
+        # The detector's probe is fixed, so it is sent first and the detector
+        # then runs on the answer
+        answer = await client.query(DETECTION_ORACLE, detector_probe())
+        return detector(lambda plaintext: answer[1:]) == mode_of[answer[:1]]
+
+    results = await asyncio.gather(*(trial() for _ in range(num_trials)))
+    return sum(results)
+
+
+async def run_demo(latency: float, pool_size: int, max_in_flight: int, trials: int):
+    """Start a server in-process and run both attacks against it."""
+    server = OracleServer(latency)
+    async with await server.start(HOST, 0) as listener:
+        port = listener.sockets[0].getsockname()[1]
+        async with AsyncOracleClient(HOST, port, pool_size, max_in_flight) as client:
+            start = perf_counter()
+            postfix = await byte_at_a_time(client)
+            elapsed = perf_counter() - start
+            print(postfix.decode("utf-8", errors="ignore"))
+            print(
+                f"🔓 Byte-at-a-time: {len(postfix)} bytes, "
+                f"{client.queries} queries in {elapsed:.2f} s"
+            )
+
+            client.queries = 0
+            start = perf_counter()
+            correct = await detection_trials(client, trials)
+            elapsed = perf_counter() - start
+            print(
+                f"🔍 Detection: {correct}/{trials} correct, "
+                f"{client.queries} queries in {elapsed:.2f} s"
+            )
+
+
+async def serve(host: str, port: int, latency: float):
+    server = OracleServer(latency)
+    async with await server.start(host, port) as listener:
+        print(f"🛰️  Serving oracles on {host}:{port}")
+        await listener.serve_forever()
+
+
+def main():
+    """Command-line entry point for the oracle server and attack demo."""
+    parser = argparse.ArgumentParser(
+        description="Local oracle server and async attack client",
+        epilog="Example: python -m challenges.oracle_server demo --latency 0.005",
+    )
+    parser.add_argument("command", choices=["serve", "demo"])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Simulated seconds per request"
+    )
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--trials", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        asyncio.run(serve(args.host, args.port, args.latency))
+    else:
+        asyncio.run(
+            run_demo(args.latency, args.pool_size, args.max_in_flight, args.trials)
+        )
+
+
+if __name__ == "__main__":
+    main()
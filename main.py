@@ -8,47 +8,85 @@ import argparse
 import sys
 import os
 import importlib
+import io
 import re
 
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stderr, redirect_stdout
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import islice
+from time import perf_counter, process_time
+from typing import Callable, Optional
 
+CHALLENGES_DIR = os.path.join(os.getcwd(), "challenges")
+CHALLENGE_FILE = re.compile(r"challenge_(\d+)\.py")
+# Every challenge module opens with a commented docstring whose first line
+# is '# """Challenge N: Title'
+CHALLENGE_TITLE = re.compile(r'^# """Challenge \d+: (.+)$')
+METADATA_LINES = 10  # Lines of each module searched for its title
+FAILURE_MARKER = "❌"  # Challenges print this when a check does not match
 
-def load_challenges():
-    """Dynamically load all challenge modules from the challenges directory."""
-    challenges_dir = os.path.join(os.getcwd(), "challenges")
-    challenge_modules = {}
 
-    if not os.path.exists(challenges_dir):
+@dataclass(frozen=True)
+class ChallengeInfo:
+    """Data class to hold what is known about a challenge before importing it."""
+
+    number: int  # The challenge number
+    title: str  # Title from the module's docstring
+    module_name: str  # Imported only when the challenge runs
+
+
+@lru_cache
+def discover_challenges() -> dict[int, ChallengeInfo]:
+    """Find the challenge modules and read their titles without importing them."""
+    if not os.path.exists(CHALLENGES_DIR):
         print("❌ Challenges directory not found!")
         return {}
 
-    # Find all challenge_XX.py files
-    for filename in sorted(os.listdir(challenges_dir)):
-        if filename.startswith("challenge_") and filename.endswith(".py"):
-            # Extract challenge number from filename
-            match = re.match(r"challenge_(\d+)\.py", filename)
-            if match:
-                challenge_num = int(match.group(1))
-                module_name = f"challenges.challenge_{challenge_num:02d}"
+    challenges = {}
+    for filename in sorted(os.listdir(CHALLENGES_DIR)):
+        match = CHALLENGE_FILE.fullmatch(filename)
+        if not match:
+            continue
+
+        number = int(match.group(1))
+        title = f"Challenge {number}"
+        with open(os.path.join(CHALLENGES_DIR, filename), "r") as f:
+            for line in islice(f, METADATA_LINES):
+                if title_match := CHALLENGE_TITLE.match(line.strip()):
+                    title = title_match.group(1)
+                    break
+
+        challenges[number] = ChallengeInfo(number, title, f"challenges.{filename[:-3]}")
 
-                try:
-                    # Dynamically import the module
-                    module = importlib.import_module(module_name)
-                    if hasattr(module, "run_challenge"):
-                        challenge_modules[challenge_num] = module.run_challenge
-                        print(f"✅ Loaded challenge {challenge_num}")
-                    else:
-                        print(
-                            f"⚠️  Challenge {challenge_num} missing run_challenge function"
-                        )
-                except ImportError as e:
-                    print(f"❌ Failed to import challenge {challenge_num}: {e}")
+    return dict(sorted(challenges.items()))
 
-    return challenge_modules
 
+def load_challenge(challenge_num: int) -> Optional[Callable[[Optional[str]], None]]:
+    """Import one challenge module and return its run_challenge function."""
+    info = discover_challenges()[challenge_num]
+    try:
+        module = importlib.import_module(info.module_name)
+    except ImportError as e:
+        print(f"❌ Failed to import challenge {challenge_num}: {e}")
+        return None
+
+    if not hasattr(module, "run_challenge"):
+        print(f"⚠️  Challenge {challenge_num} missing run_challenge function")
+        return None
+    return module.run_challenge
 
-# Load all available challenges dynamically
-CHALLENGE_FUNCTIONS = load_challenges()
+
+def positive_int(value: str) -> int:
+    """Argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
 
 
 def main():
@@ -63,6 +101,7 @@ def main():
             python main.py -c 1                      # Short form
             python main.py --challenge 1 --input "49276d206b696c6c696e6720796f757220627261696e206c696b65206120706f69736f6e6f7573206d757368726f6f6d"
             python main.py --all                     # Run all challenges
+            python main.py --all --jobs 4            # Run all challenges, 4 at a time
         """,
     )
 
@@ -78,6 +117,14 @@ def main():
 
     parser.add_argument("--all", action="store_true", help="Run all challenges")
 
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=positive_int,
+        default=None,
+        help="Challenges run at once with --all (default: one per CPU)",
+    )
+
     args = parser.parse_args()
 
     # Display banner
@@ -87,7 +134,8 @@ def main():
     if args.list:
         list_challenges()
     elif args.all:
-        run_all_challenges()
+        if not run_all_challenges(jobs=args.jobs):
+            sys.exit(1)
     elif args.challenge:
         run_challenge(args.challenge, args.input)
     else:
@@ -106,30 +154,8 @@ def list_challenges():
 
 
 def get_challenge_list():
-    """Return dictionary of available challenges based on loaded modules."""
-    # Default descriptions for known challenges
-    challenge_descriptions = {
-        1: "Convert hex to base64",
-        2: "Fixed XOR",
-        3: "Single-byte XOR cipher",
-        4: "Detect single-character XOR",
-        5: "Implement repeating-key XOR",
-        6: "Break repeating-key XOR",
-        7: "AES in ECB mode",
-        8: "Detect AES in ECB mode",
-        9: "Implement PKCS#7 padding",
-        10: "Implement CBC mode encryption",
-    }
-
-    # Build list from actually loaded challenges
-    available_challenges = {}
-    for challenge_num in sorted(CHALLENGE_FUNCTIONS.keys()):
-        description = challenge_descriptions.get(
-            challenge_num, f"Challenge {challenge_num}"
-        )
-        available_challenges[challenge_num] = description
-
-    return available_challenges
+    """Return dictionary of available challenges and their titles."""
+    return {number: info.title for number, info in discover_challenges().items()}
 
 
 def run_challenge(challenge_num: int, input_data: Optional[str] = None):
@@ -144,25 +170,155 @@ def run_challenge(challenge_num: int, input_data: Optional[str] = None):
     print(f"\n🚀 Running Challenge {challenge_num}: {challenges[challenge_num]}")
     print("-" * 50)
 
+    # The module, and whatever it depends on, is only imported now
+    challenge_function = load_challenge(challenge_num)
+    if challenge_function is None:
+        return
+
     try:
-        # Use the dynamically loaded function
-        if challenge_num in CHALLENGE_FUNCTIONS:
-            CHALLENGE_FUNCTIONS[challenge_num](input_data)
-        else:
-            print(f"⚠️  Challenge {challenge_num} not implemented yet!")
+        challenge_function(input_data)
 
     except Exception as e:
         print(f"❌ Error running challenge {challenge_num}: {e}")
 
 
-def run_all_challenges():
-    """Run all implemented challenges."""
-    challenges = get_challenge_list()
-    print(f"\n🏃 Running all {len(challenges)} challenges...\n")
+@dataclass
+class ChallengeResult:
+    """Data class to hold the outcome of one challenge run by the --all runner."""
+
+    number: int  # The challenge number
+    passed: bool  # No exception and no failed check in the output
+    wall_seconds: float  # Elapsed time
+    cpu_seconds: float  # User and system time, including any worker processes
+    peak_rss_kb: Optional[int]  # Largest resident set of the challenge or its workers
+    output: str  # Everything the challenge printed
+    error: Optional[str] = None  # The exception that stopped it, if any
+
 
-    for challenge_num in challenges.keys():
-        run_challenge(challenge_num)
-        print()  # Add spacing between challenges
+# ru_maxrss is in bytes on macOS and in kilobytes everywhere else
+MAXRSS_UNIT_BYTES = 1 if sys.platform == "darwin" else 1024
+
+
+@lru_cache(maxsize=None)
+def get_resource():
+    """Return the resource module, or None where it does not exist (Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource
+
+
+def cpu_seconds() -> float:
+    """User and system time of this process and its waited-for children.
+
+    Without the resource module only this process's own time is counted.
+    """
+    resource = get_resource()
+    if resource is None:
+        return process_time()
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set of this process or its children, None if unknown."""
+    resource = get_resource()
+    if resource is None:
+        return None
+    peak = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss,
+    )
+    return peak * MAXRSS_UNIT_BYTES // 1024
+
+
+def run_captured(challenge_num: int) -> ChallengeResult:
+    """Worker task: run one challenge in this process and capture its output.
+
+    Each challenge gets a fresh worker process, so the process's peak RSS
+    is the challenge's own.
+    """
+    output, error = io.StringIO(), None
+    start_wall, start_cpu = perf_counter(), cpu_seconds()
+
+    with redirect_stdout(output), redirect_stderr(output):
+        try:
+            challenge_function = load_challenge(challenge_num)
+            if challenge_function is None:
+                error = "Challenge could not be loaded"
+            else:
+                challenge_function(None)
+        except (Exception, SystemExit) as e:
+            error = f"{type(e).__name__}: {e}"
+
+    text = output.getvalue()
+    return ChallengeResult(
+        number=challenge_num,
+        passed=error is None and FAILURE_MARKER not in text,
+        wall_seconds=perf_counter() - start_wall,
+        cpu_seconds=cpu_seconds() - start_cpu,
+        peak_rss_kb=peak_rss_kb(),
+        output=text,
+        error=error,
+    )
+
+
+def run_all_challenges(
+    challenge_nums: Optional[list[int]] = None, jobs: Optional[int] = None
+) -> bool:
+    """Run challenges in parallel, each in its own process; True if all passed.
+
+    Every challenge's output is captured and printed as a block once it
+    finishes, followed by a summary table of timings and results.
+    """
+    challenges = get_challenge_list()
+    challenge_nums = challenge_nums or list(challenges)
+    if jobs is not None and jobs < 1:
+        raise ValueError("jobs must be at least 1")
+    jobs = jobs or os.cpu_count() or 1
+    print(f"\n🏃 Running {len(challenge_nums)} challenges, {jobs} at a time...\n")
+
+    results = []
+    start = perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs, max_tasks_per_child=1) as executor:
+        futures = [executor.submit(run_captured, num) for num in challenge_nums]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"🚀 Challenge {result.number}: {challenges[result.number]}")
+            print("-" * 50)
+            print(result.output.rstrip())
+            if result.error:
+                print(f"❌ Error running challenge {result.number}: {result.error}")
+            print()  # Add spacing between challenges
+    elapsed = perf_counter() - start
+
+    print_summary(sorted(results, key=lambda result: result.number), challenges)
+    passed = sum(result.passed for result in results)
+    print(f"\n🏁 {passed}/{len(results)} passed in {elapsed:.2f} s")
+    return passed == len(results)
+
+
+def print_summary(results: list[ChallengeResult], challenges: dict[int, str]):
+    """Print one row per challenge with its status, timings and peak memory."""
+    title_width = max(len(challenges[result.number]) for result in results)
+    print(
+        f"{'#':>3}  {'Challenge':<{title_width}}  Status  "
+        f"{'Wall s':>7}  {'CPU s':>7}  {'Peak MB':>8}"
+    )
+    print("-" * (title_width + 44))
+    for result in results:
+        status = "✅ pass" if result.passed else "❌ fail"
+        peak = (
+            "n/a" if result.peak_rss_kb is None else f"{result.peak_rss_kb / 1024:.1f}"
+        )
+        print(
+            f"{result.number:>3}  {challenges[result.number]:<{title_width}}  "
+            f"{status}  {result.wall_seconds:>7.2f}  {result.cpu_seconds:>7.2f}  "
+            f"{peak:>8}"
+        )
 
 
 def interactive_mode():
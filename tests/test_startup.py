@@ -0,0 +1,51 @@
+# """Startup cost of the command-line runner
+# Listing the challenges must not import any challenge module or the heavy libraries they
+# use, so `python main.py --list` stays fast. The imports are measured in a fresh
+# interpreter with -X importtime.
+# """
+
+import subprocess
+import sys
+
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+IMPORT_TIME_BUDGET_US = 250_000  # Total cumulative import time allowed, in µs
+FORBIDDEN_PREFIXES = ("challenges.challenge_", "numpy", "Crypto", "PIL")
+
+
+def import_times(*args: str) -> list[tuple[str, int, bool]]:
+    """Run main.py in a fresh interpreter and report every module it imports.
+
+    Each entry is (module, cumulative import time in µs, whether it was
+    imported at the top level of the import tree).
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "main.py", *args],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Nested imports are indented under the module that imported them
+        times.append((name.strip(), int(cumulative), not name.startswith("  ")))
+    return times
+
+
+def test_list_imports_no_challenges():
+    imported = [name for name, _, _ in import_times("--list")]
+    forbidden = [name for name in imported if name.startswith(FORBIDDEN_PREFIXES)]
+    assert not forbidden, f"--list imported {forbidden}"
+
+
+def test_list_import_time_within_budget():
+    # A nested import's time is already counted in its parent's
+    times = import_times("--list")
+    total = sum(cumulative for _, cumulative, top_level in times if top_level)
+    assert total < IMPORT_TIME_BUDGET_US, f"--list spent {total} µs importing"